@@ -1,11 +1,26 @@
+from datetime import date, timedelta
 from pathlib import Path
 
-from flask import current_app
+from flask import current_app, g, request
 
 from among_us_friends.repository import Repository
 
 
-def open_repository():
+def open_repository(readonly=False):
+    """A repository for the configured database. Read-only repositories see one consistent snapshot and never wait
+    on writers. Statements are recorded in the request's query log."""
     db_path = Path(current_app.config['DB_PATH'])
     schema_path = Path(current_app.config['SCHEMA_PATH'])
-    return Repository(db_path, schema_path)
+    return Repository(db_path, schema_path, readonly=readonly, query_log=g.get('query_log'))
+
+
+def match_window():
+    """The (since, last) window of matches selected by the ``days`` and ``last`` arguments of the request."""
+    days = request.args.get('days', type=int)
+    since = (date.today() - timedelta(days=days)).isoformat() if days is not None else ''
+    return since, request.args.get('last', -1, type=int)
+
+
+def page_limit(default: int = 20, maximum: int = 100) -> int:
+    """The ``limit`` argument of the request, clamped to between 1 and ``maximum``."""
+    return max(1, min(request.args.get('limit', default, type=int), maximum))
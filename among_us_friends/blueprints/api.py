@@ -1,33 +1,164 @@
-from flask import Blueprint, request, Response
-from werkzeug.exceptions import BadRequest
+from typing import Callable, Iterable
+from uuid import UUID
 
-from among_us_friends.blueprints import open_repository
+from flask import Blueprint, request, Response, jsonify, json, render_template, current_app
+from flask_login import login_required
+from werkzeug.exceptions import BadRequest, NotFound, ServiceUnavailable
+
+from among_us_friends import games_controller
+from among_us_friends.blueprints import open_repository, match_window, page_limit
+from among_us_friends.dependencies import DependencyCall
+from among_us_friends.games import HtmlGamesFormatter
+from among_us_friends.imposter_stat import HtmlImposterStatsFormatter
+from among_us_friends.repository import NotFoundException, SearchTermException
+from among_us_friends.room_correlations import HtmlRoomCorrelationsFormatter
+from among_us_friends.room_view import room_views
 
 api = Blueprint('api', __name__)
 
 
-class LiveGamesHtmlFormatter:
-    pass
-
-
-# @api.route('/api/rooms/<room_id>/games')
-# def live_room_games(room_id):
-#     known_accept = {
-#         'text/html': LiveGamesHtmlFormatter
-#     }
-#     try:
-#         formatter = known_accept[request.headers['Accept']]()
-#     except KeyError as e:
-#         raise BadRequest('api cannot handle given Accept header.')
-#
-#     with open_repository() as repo:
-#         pass
-#
-#     return Response(
-#         formatter.format(live_games),
-#         status=200,
-#         headers={
-#             'Etag': live_games.etag
-#         },
-#         mimetype=formatter.mimetype
-#     )
+def _fragment(html: Callable[[], Iterable[str]], data: Callable[[], object]):
+    """A room page section as HTML or JSON by the Accept header, HTML without one. The ETag is a hash of the body, so
+    a client holding the section gets a 304 until the section itself changes, whatever else in the room did."""
+    mimetype = 'text/html'
+    if request.accept_mimetypes:
+        mimetype = request.accept_mimetypes.best_match(['text/html', 'application/json'])
+    if mimetype is None:
+        raise BadRequest('api cannot handle given Accept header.')
+    body = ''.join(html()) if mimetype == 'text/html' else json.dumps(data())
+    response = Response(body, mimetype=mimetype)
+    response.vary.add('Accept')
+    response.add_etag()
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _room_view(repo, room_id):
+    try:
+        room = repo.room_dao().require_room(UUID(room_id))
+    except NotFoundException:
+        raise NotFound()
+    since, last = match_window()
+    return room_views.get(repo, room, request.args.get('mode', '%'), (), since, last).bind(repo)
+
+
+def _stats(stats):
+    return [{'title': s.title,
+             'total_matches': s.total_matches,
+             'times_imposter': s.times_imposter,
+             'imposter_counts': s.imposter_counts,
+             'deviation': s.deviation,
+             'wins_crew': s.wins_crew,
+             'wins_imposter': s.wins_imposter,
+             'loss_crew': s.loss_crew,
+             'loss_imposter': s.loss_imposter}
+            for s in sorted(stats, key=lambda k: k.total_matches, reverse=True)]
+
+
+@api.route('/api/rooms/<room_id>/games')
+@login_required
+def live_room_games(room_id):
+    games = DependencyCall('games', games_controller.get_games_for_room, UUID(room_id)).result(
+        current_app.config.get('GAME_SERVICE_TIMEOUT', 1.0))
+    if games is None:
+        raise ServiceUnavailable('games unavailable.')
+    return _fragment(HtmlGamesFormatter(games).iter_format,
+                     lambda: [{'uuid': game.uuid.hex, 'title': game.title, 'owner': game.owner.hex} for game in games])
+
+
+@api.route('/api/rooms/<room_id>/matches')
+@login_required
+def room_matches(room_id):
+    with open_repository(readonly=True) as repo:
+        match_counts = _room_view(repo, room_id).match_counts
+        return _fragment(
+            lambda: (render_template('room_matches.html', match_counts=match_counts),),
+            lambda: [{'uuid': match.uuid.hex, 'title': match.title, 'end_at': match.end_at, 'results': count,
+                      'players': match.players, 'mode': match.mode, 'map': match.map, 'result': match.result,
+                      'network': match.network}
+                     for match, count in match_counts if match is not None])
+
+
+@api.route('/api/rooms/<room_id>/players')
+@login_required
+def room_players(room_id):
+    with open_repository(readonly=True) as repo:
+        stats = _room_view(repo, room_id).player_stats
+        return _fragment(HtmlImposterStatsFormatter(stats).iter_format, lambda: _stats(stats))
+
+
+@api.route('/api/rooms/<room_id>/colors')
+@login_required
+def room_colors(room_id):
+    with open_repository(readonly=True) as repo:
+        stats = _room_view(repo, room_id).color_stats
+        return _fragment(HtmlImposterStatsFormatter(stats).iter_format, lambda: _stats(stats))
+
+
+@api.route('/api/rooms/<room_id>/correlations')
+@login_required
+def room_correlations(room_id):
+    limit = page_limit()
+    with open_repository(readonly=True) as repo:
+        corr = _room_view(repo, room_id).correlations
+        return _fragment(
+            HtmlRoomCorrelationsFormatter(corr, limit).iter_format,
+            lambda: {'imposter_pairs': [{'players': [a, b], 'matches': count}
+                                        for a, b, count in corr.imposter_pairs[:limit]],
+                     'teammates': [{'players': [a, b], 'matches': games, 'win_rate': rate}
+                                   for a, b, games, rate in corr.teammates[:limit]],
+                     'killed_by': [{'crewmate': a, 'imposter': b, 'deaths': deaths, 'matches': games}
+                                   for a, b, deaths, games in corr.killed_by[:limit]],
+                     'chosen_probability': [{'player': name, 'times_imposter': times, 'expected': expected}
+                                            for name, times, expected in corr.chosen_probability[:limit]]})
+
+
+@api.route('/api/rooms/<room_id>/keywords')
+@login_required
+def room_keywords(room_id):
+    """Per match or per player counts of the room's results whose comments mention each ``term``."""
+    terms = request.args.getlist('term') or ['panda']
+    by = request.args.get('by', 'match')
+    if by not in ('match', 'user'):
+        raise BadRequest('by must be match or user.')
+    counts = {term: [] for term in terms}
+    with open_repository(readonly=True) as repo:
+        try:
+            room = repo.room_dao().require_room(UUID(room_id))
+        except NotFoundException:
+            raise NotFound()
+        try:
+            for term, uuid, title, count in repo.result_dao().keyword_counts_for_room(
+                    room, terms, request.args.get('mode', '%'), by):
+                counts[term].append({'uuid': uuid.hex, 'title': title, 'count': count})
+        except SearchTermException as e:
+            raise BadRequest(str(e))
+    return jsonify(counts)
+
+
+@api.route('/api/comments/search')
+@login_required
+def search_comments():
+    """Results whose comments contain every word of ``q``, optionally only in one room, best match first."""
+    text = request.args.get('q', '')
+    if not text.strip():
+        raise BadRequest('q is required.')
+    limit = page_limit()
+    with open_repository(readonly=True) as repo:
+        room = None
+        try:
+            if 'room' in request.args:
+                room = repo.room_dao().require_room(UUID(request.args['room']))
+        except NotFoundException:
+            raise NotFound()
+        try:
+            hits = [{'uuid': hit.uuid.hex,
+                     'match': {'uuid': hit.match_uuid.hex, 'title': hit.match_title, 'end_at': hit.end_at},
+                     'username': hit.username,
+                     'comments': hit.comments,
+                     'rank': hit.rank}
+                    for hit in repo.result_dao().search_comments(text, room, limit)]
+        except SearchTermException as e:
+            raise BadRequest(str(e))
+    return jsonify(hits)
@@ -0,0 +1,62 @@
+from uuid import UUID
+
+from flask import Blueprint, render_template, request, url_for
+from flask_login import current_user, login_required
+from werkzeug.exceptions import abort
+
+from among_us_friends.blueprints import open_repository, page_limit
+from among_us_friends.imposter_stat import ImposterStat
+from among_us_friends.repository import NotFoundException, StatsDao
+
+leaderboards = Blueprint('leaderboards', __name__)
+
+
+def _after():
+    """The (value, user uuid) of the ``after`` and ``after_user`` arguments continuing a leaderboard."""
+    value = request.args.get('after', type=float)
+    if value is None:
+        abort(400)
+    try:
+        return value, UUID(request.args.get('after_user', ''))
+    except ValueError:
+        abort(400)
+
+
+def _leaderboard(lobby_id=None):
+    ranking = request.args.get('ranking', 'win_rate')
+    if ranking not in StatsDao.rankings:
+        abort(400)
+    min_games = request.args.get('min_games', 10, type=int)
+    limit = page_limit()
+    after = None
+    if 'after' in request.args or 'after_user' in request.args:
+        after = _after()
+    with open_repository(readonly=True) as repo:
+        lobby = None
+        try:
+            if lobby_id is not None:
+                lobby = repo.lobby_dao().require_lobby(UUID(lobby_id))
+            entries = list(repo.stats_dao().leaderboard(lobby, ranking, min_games, limit, after))
+        except NotFoundException:
+            abort(404)
+    stats = [(entry, ImposterStat.from_counts(entry.username, *entry[3:])) for entry in entries]
+    rankings = {name: url_for(request.endpoint, **request.view_args, ranking=name, min_games=min_games)
+                for name in StatsDao.rankings}
+    next_page = None
+    if len(entries) == limit:
+        next_page = url_for(request.endpoint, **request.view_args, ranking=ranking, min_games=min_games, limit=limit,
+                            after=repr(entries[-1].value), after_user=entries[-1].uuid.hex)
+    return render_template('leaderboard.html', lobby=lobby, stats=stats, rankings=rankings, min_games=min_games,
+                           next_page=next_page, user=current_user)
+
+
+@leaderboards.route('/leaderboard')
+@login_required
+def global_leaderboard():
+    return _leaderboard()
+
+
+@leaderboards.route('/lobbies/<lobby_id>/leaderboard')
+@login_required
+def lobby_leaderboard(lobby_id):
+    return _leaderboard(lobby_id)
@@ -19,10 +19,9 @@ def new_lobby():
 @login_required
 def lobby(lobby_id):
     lobby_uuid = UUID(lobby_id)
-    with open_repository() as repo:
+    with open_repository(readonly=True) as repo:
         lobby = repo.lobby_dao().require_lobby(lobby_uuid)
-        rooms = repo.room_dao().list_for_lobby(lobby)
-    rooms = list(rooms)
+        rooms = list(repo.room_dao().list_for_lobby(lobby))
     return render_template('lobby.html', lobby=lobby, rooms=rooms, user=current_user)
 
 
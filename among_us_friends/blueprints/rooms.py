@@ -1,17 +1,24 @@
+from contextlib import ExitStack
+from hashlib import blake2b
 from uuid import UUID
 
-from flask import Blueprint, render_template, request, url_for
+from flask import Blueprint, render_template, request, url_for, Response, jsonify, stream_template, \
+    stream_with_context, current_app
 from flask_login import login_required, current_user
 from werkzeug.exceptions import abort
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import redirect
 
 from among_us_friends import games_controller
-from among_us_friends.blueprints import open_repository
-from among_us_friends.room_correlations import HtmlRoomCorrelationsFormatter, RoomCorrelations
+from among_us_friends.blueprints import open_repository, match_window
+from among_us_friends.dependencies import DependencyCall
+from among_us_friends.export import export_formatters, gameroot_row, survey_row, GAMEROOT_COLUMNS, SURVEY_COLUMNS
+from among_us_friends.room_correlations import HtmlRoomCorrelationsFormatter
 from among_us_friends.games import HtmlGamesFormatter
 from among_us_friends.imposter_stat import HtmlImposterStatsFormatter
-from among_us_friends.stats import PlayersMatchesStats, ColorsMatchesStats
 from among_us_friends.repository import NotFoundException
+from among_us_friends.room_view import room_views
+from among_us_friends.stats import TrendStats, group_keys
 
 rooms = Blueprint('rooms', __name__)
 
@@ -20,31 +27,102 @@ rooms = Blueprint('rooms', __name__)
 @login_required
 def room(room_id):
     mode = request.args.get('mode', '%')
+    groupings = tuple(name for name in request.args.getlist('group') if name in group_keys)
+    since, last = match_window()
     room_uuid = UUID(room_id)
-    games = games_controller.get_games_for_room(room_uuid)
-    print(games)
-    with open_repository() as repo:
+    games_call = DependencyCall('games', games_controller.get_games_for_room, room_uuid)
+    with ExitStack() as stack:
+        repo = stack.enter_context(open_repository(readonly=True))
         try:
             room = repo.room_dao().require_room(room_uuid)
         except NotFoundException:
             abort(404)
-        matches = list(repo.match_dao().list_for_room(room, mode))
         lobby_id = repo.lobby_dao().get_by_rowid(room.lobby).uuid.hex
-        counts = repo.result_dao().counts_by_match_rowid_for_room(room)
-        player_stats = list(PlayersMatchesStats(matches).using(repo))
-        color_stats = list(ColorsMatchesStats(matches).using(repo))
-        correlations = RoomCorrelations(room, matches).using(repo)
-    counts = dict(counts)
-    matches = {m.rowid: m for m in matches}
-    match_counts = ((matches.get(k, None), counts.get(k, None)) for k in counts.keys() | matches.keys())
-    return render_template(
-        'room.html', room=room, match_counts=match_counts, user=current_user,
-        lobby=lobby_id,
-        games=HtmlGamesFormatter(games),
-        player_stats=HtmlImposterStatsFormatter(player_stats),
-        color_stats=HtmlImposterStatsFormatter(color_stats),
-        correlations=HtmlRoomCorrelationsFormatter(correlations)
-    )
+        view = room_views.get(repo, room, mode, groupings, since, last)
+        # The games are left out, the games section revalidates against its own ETag.
+        etag = blake2b(repr((view.version, mode, groupings, since, last, current_user.get_id())).encode('utf-8'),
+                       digest_size=16).hexdigest()
+        if not is_resource_modified(request.environ, etag=etag, last_modified=view.updated_at):
+            response = Response(status=304)
+        else:
+            # The page is sent as it renders, from the same snapshot the version was read in. The repository stays
+            # open until the stream ends, or until the response is closed if it never starts.
+            snapshot = stack.pop_all()
+
+            def games():
+                # Waited for only when the page reaches the games, after the database sections.
+                return HtmlGamesFormatter(games_call.result(current_app.config.get('GAME_SERVICE_TIMEOUT', 1.0)))
+
+            def generate():
+                try:
+                    yield from stream_template(
+                        'room.html', room=room, view=view.bind(repo), user=current_user, lobby=lobby_id,
+                        games=games, group_keys=group_keys,
+                        imposter_stats=HtmlImposterStatsFormatter, correlations=HtmlRoomCorrelationsFormatter)
+                finally:
+                    snapshot.close()
+            response = Response(stream_with_context(generate()), mimetype='text/html')
+            response.call_on_close(snapshot.close)
+    response.set_etag(etag)
+    response.last_modified = view.updated_at
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@rooms.route("/rooms/<room_id>/trend")
+@login_required
+def trend(room_id):
+    """Per-group series of stats over a sliding window of the room's last ``window`` matches."""
+    mode = request.args.get('mode', '%')
+    key = group_keys.get(request.args.get('group', 'player'))
+    window = request.args.get('window', 20, type=int)
+    if key is None or window < 1:
+        abort(400)
+    since, _ = match_window()
+    with open_repository(readonly=True) as repo:
+        try:
+            room = repo.room_dao().require_room(UUID(room_id))
+        except NotFoundException:
+            abort(404)
+        series = TrendStats(room, mode, key, window, since).using(repo)
+    fields = ('end_at', 'matches', 'times_imposter', 'deviation', 'wins_crew', 'wins_imposter', 'loss_crew',
+              'loss_imposter', 'one_imposter', 'two_imposters', 'three_imposters')
+    return jsonify({title: [dict(zip(fields, point)) for point in points] for title, points in series.items()})
+
+
+@rooms.route("/rooms/<room_id>/export")
+@login_required
+def export(room_id):
+    """The room's ``matches`` or ``results`` as CSV in the gameroot or survey layout, or as NDJSON, streamed as they
+    are read. Rows come in rowid order after ``after``, the last Row Id sent resumes an interrupted export."""
+    table = request.args.get('table', 'results')
+    if table not in ('matches', 'results'):
+        abort(400)
+    formatter = export_formatters.get(request.args.get('format', 'ndjson'))
+    if formatter is None:
+        abort(400)
+    mode = request.args.get('mode', '%')
+    since, _ = match_window()
+    after = request.args.get('after', 0, type=int)
+    with open_repository(readonly=True) as repo:
+        try:
+            room = repo.room_dao().require_room(UUID(room_id))
+            player = repo.user_dao().require_username(request.args['player']) if 'player' in request.args else None
+        except NotFoundException:
+            abort(404)
+
+    def generate():
+        with open_repository(readonly=True) as export_repo:
+            if table == 'matches':
+                rows = map(gameroot_row, export_repo.match_dao().export_for_room(room, mode, since, player, after))
+                yield from formatter(GAMEROOT_COLUMNS, rows).iter_format()
+            else:
+                rows = map(survey_row, export_repo.result_dao().export_for_room(room, mode, since, player, after))
+                yield from formatter(SURVEY_COLUMNS, rows).iter_format()
+    response = Response(stream_with_context(generate()), mimetype=formatter.mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=f'{room.title}-{table}.{formatter.extension}')
+    return response
 
 
 @rooms.route('/rooms/<room_id>/createGame', methods=['GET', 'POST'])
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from flask import Blueprint, render_template, url_for
+from flask import Blueprint, render_template, url_for, Response, stream_with_context
 
 from among_us_friends.blueprints import open_repository
 
@@ -9,16 +9,17 @@ users = Blueprint('users', __name__)
 
 @users.route('/users')
 def all_users():
-    ret = '<ul>'
-    with open_repository() as repo:
-        for user in repo.user_dao().list():
-            ret += f'<li><a href={url_for("users.user", user_id=user.uuid.hex)}>{user.username}</a></li>'
-    ret += '</ul>'
-    return ret
+    def generate():
+        yield '<ul>'
+        with open_repository(readonly=True) as repo:
+            for user in repo.user_dao().list():
+                yield f'<li><a href={url_for("users.user", user_id=user.uuid.hex)}>{user.username}</a></li>'
+        yield '</ul>'
+    return Response(stream_with_context(generate()), mimetype='text/html')
 
 
 @users.route('/users/<user_id>')
 def user(user_id):
-    with open_repository() as repo:
+    with open_repository(readonly=True) as repo:
         user = repo.user_dao().require_uuid(UUID(user_id))
     return render_template('user.html', user=user)
@@ -0,0 +1,43 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from time import perf_counter
+from typing import Callable
+
+from flask import current_app, g
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyCall:
+    """A call to a service other than the database, run on a shared worker pool while the request does its own work.
+
+    The call runs in a new app context of the current app, so it can read the app's config.
+    """
+    workers = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dependency')
+
+    def __init__(self, name: str, fn: Callable, *args):
+        self.name = name
+        self.started = perf_counter()
+        app = current_app._get_current_object()
+
+        def call():
+            with app.app_context():
+                return fn(*args)
+        self._future = self.workers.submit(call)
+
+    def result(self, timeout: float, default=None):
+        """The result of the call, or ``default`` if it failed or had not finished ``timeout`` seconds after it was
+        started. The wait is added to the request's dependency timings."""
+        try:
+            value, status = self._future.result(max(0.0, self.started + timeout - perf_counter())), 'ok'
+        except TimeoutError:
+            self._future.cancel()
+            value, status = default, 'timeout'
+            logger.warning(f'{self.name} did not answer within {timeout}s')
+        except Exception as e:
+            value, status = default, 'error'
+            logger.warning(f'{self.name} failed: {e!r}')
+        timings = g.get('dependency_timings')
+        if timings is not None:
+            timings.add(self.name, perf_counter() - self.started, status)
+        return value
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from among_us_friends.repository import SqliteMatchExport, SqliteResultExport
+
+# The columns of the gameroot and survey CSVs read by otherdata/loader.py, followed by the rowid to resume from.
+GAMEROOT_COLUMNS = ('Game Number', 'ctrl+alt+shift+;', 'Num Players', 'Mode', 'Map', 'Result', 'Network', 'Host',
+                    'game master', 'Row Id')
+SURVEY_COLUMNS = ('Timestamp', 'Game Number', 'Your Name or Discord Name', 'Among Us Username', 'Platform', 'Color',
+                  'Were you the / an Imposter?', 'Did you get a Victory?', 'Did you die?', 'Rage Comments', 'Row Id')
+
+
+def _timestamp(iso: str) -> str:
+    return datetime.fromisoformat(iso).strftime('%m/%d/%Y %H:%M:%S')
+
+
+def _yes_no(value: bool) -> str:
+    return 'Yes' if value else 'No'
+
+
+def gameroot_row(match: SqliteMatchExport) -> tuple:
+    return (match.title, _timestamp(match.end_at), match.players, match.mode, match.map, match.result,
+            match.network, match.host, match.owner, match.rowid)
+
+
+def survey_row(result: SqliteResultExport) -> tuple:
+    # The in-game username is not stored, the account's username stands in for it.
+    return (_timestamp(result.r_time), result.match_title, result.username, result.username, result.platform,
+            result.color, _yes_no(result.imposter), _yes_no(result.victory), _yes_no(result.death),
+            result.comments or '', result.rowid)
+
+
+class CsvExportFormatter:
+    mimetype = 'text/csv'
+    extension = 'csv'
+
+    def __init__(self, columns: Sequence[str], rows: Iterable[tuple], batch_size: int = 256):
+        self.columns = columns
+        self.rows = rows
+        self.batch_size = batch_size
+
+    def iter_format(self) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns)
+        rows = iter(self.rows)
+        for batch in iter(lambda: list(islice(rows, self.batch_size)), []):
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Only the header, there were no rows.
+            yield buffer.getvalue()
+
+
+class NdjsonExportFormatter:
+    mimetype = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def __init__(self, columns: Sequence[str], rows: Iterable[tuple], batch_size: int = 256):
+        self.columns = columns
+        self.rows = rows
+        self.batch_size = batch_size
+
+    def iter_format(self) -> Iterator[str]:
+        rows = iter(self.rows)
+        for batch in iter(lambda: list(islice(rows, self.batch_size)), []):
+            yield ''.join(json.dumps(dict(zip(self.columns, row))) + '\n' for row in batch)
+
+
+export_formatters = {
+    'csv': CsvExportFormatter,
+    'ndjson': NdjsonExportFormatter,
+}
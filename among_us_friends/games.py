@@ -3,11 +3,17 @@ from flask import url_for
 
 class HtmlGamesFormatter:
     def __init__(self, games):
+        """``games`` is None when the game service could not be reached."""
         self.games = games
 
     def format(self):
-        fmt = '<ol>'
+        return ''.join(self.iter_format())
+
+    def iter_format(self):
+        if self.games is None:
+            yield '<p>Games unavailable</p>'
+            return
+        yield '<ol>'
         for game in self.games:
-            fmt += f'''<li><a href="{url_for('games.game', game_id=game.uuid.hex)}">{game.title}</a></li>'''
-        fmt += '</ol>'
-        return fmt
+            yield f'''<li><a href="{url_for('games.game', game_id=game.uuid.hex)}">{game.title}</a></li>'''
+        yield '</ol>'
@@ -38,11 +38,12 @@ class JsonGame(Game):
 class GameServiceSocket:
     _socket: socket
 
-    def __init__(self, address):
+    def __init__(self, address, timeout=None):
         self._address = address
+        self._timeout = timeout
 
     def __enter__(self):
-        self._socket = create_connection(self._address)
+        self._socket = create_connection(self._address, self._timeout)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -79,7 +80,7 @@ class GameServiceSocket:
 
 
 def _service():
-    return GameServiceSocket(current_app.config['GAME_SERVICE'])
+    return GameServiceSocket(current_app.config['GAME_SERVICE'], current_app.config.get('GAME_SERVICE_TIMEOUT', 1.0))
 
 
 def create_game(owner: User, room_id: UUID, title: str) -> UUID:
@@ -1,19 +1,18 @@
-from typing import Iterable
+from typing import Dict, Iterable
 
 from among_us_friends.repository import SqliteResult
 
 
-class ImposterStat:
-    def __init__(self, title: str):
-        self.title: str = title
-        self.total_matches: int = 0
-        self.times_imposter: int = 0
-        self.deviation: float = 0.0
-        self.wins_crew: int = 0
-        self.wins_imposter: int = 0
-        self.loss_crew: int = 0
-        self.loss_imposter: int = 0
-        self.imposter_counts = {1: 0, 2: 0, 3: 0}
+class ImposterStatProperties:
+    """The properties derived from the counters of an ImposterStat, shared with the rows of a StatsTable."""
+    __slots__ = ()
+    total_matches: int
+    times_imposter: int
+    wins_crew: int
+    wins_imposter: int
+    loss_crew: int
+    loss_imposter: int
+    imposter_counts: Dict[int, int]
 
     @property
     def times_crew(self):
@@ -55,6 +54,33 @@ class ImposterStat:
             pct = 'NA'
         return f'{pct}%'
 
+
+class ImposterStat(ImposterStatProperties):
+    def __init__(self, title: str):
+        self.title: str = title
+        self.total_matches: int = 0
+        self.times_imposter: int = 0
+        self.deviation: float = 0.0
+        self.wins_crew: int = 0
+        self.wins_imposter: int = 0
+        self.loss_crew: int = 0
+        self.loss_imposter: int = 0
+        self.imposter_counts = {1: 0, 2: 0, 3: 0}
+
+    @classmethod
+    def from_counts(cls, title, total_matches, times_imposter, deviation, wins_crew, wins_imposter, loss_crew,
+                    loss_imposter, one_imposter, two_imposters, three_imposters):
+        stat = cls(title)
+        stat.total_matches = total_matches
+        stat.times_imposter = times_imposter
+        stat.deviation = deviation
+        stat.wins_crew = wins_crew
+        stat.wins_imposter = wins_imposter
+        stat.loss_crew = loss_crew
+        stat.loss_imposter = loss_imposter
+        stat.imposter_counts = {1: one_imposter, 2: two_imposters, 3: three_imposters}
+        return stat
+
     def tablulate(self, match, match_num_imposters, result: SqliteResult):
         self.total_matches += 1
         self.times_imposter += int(result.imposter)
@@ -73,7 +99,10 @@ class HtmlImposterStatsFormatter:
         self.imposters = imposters
 
     def format(self):
-        fmt = '<table><tr>' \
+        return ''.join(self.iter_format())
+
+    def iter_format(self):
+        yield '<table><tr>' \
               '<th>Title</th>' \
               '<th>#Matches</th>' \
               '<th>#Imposter</th>' \
@@ -84,15 +113,14 @@ class HtmlImposterStatsFormatter:
               '<th>Losses Imposter</th>' \
               '</tr>'
         for p in sorted(self.imposters, key=lambda k: k.total_matches, reverse=True):
-            fmt += '<tr>' \
-                   f'<td>{p.title}</td>' \
-                   f'<td>{p.total_matches}</td>' \
-                   f'<td><b>{p.times_imposter}</b> {p.i_counts}</td>' \
-                   f'<td>{round(p.deviation, 2)}</td>' \
-                   f'<td>{p.wins_crew} / {p.wins_crew_pct}</td>' \
-                   f'<td>{p.wins_imposter} / {p.wins_imposter_pct}</td>' \
-                   f'<td>{p.loss_crew} / {p.loss_crew_pct}</td>' \
-                   f'<td>{p.loss_imposter} / {p.loss_imposter_pct}</td>' \
-                   '</tr>'
-        fmt += '</table>'
-        return fmt
+            yield '<tr>' \
+                  f'<td>{p.title}</td>' \
+                  f'<td>{p.total_matches}</td>' \
+                  f'<td><b>{p.times_imposter}</b> {p.i_counts}</td>' \
+                  f'<td>{round(p.deviation, 2)}</td>' \
+                  f'<td>{p.wins_crew} / {p.wins_crew_pct}</td>' \
+                  f'<td>{p.wins_imposter} / {p.wins_imposter_pct}</td>' \
+                  f'<td>{p.loss_crew} / {p.loss_crew_pct}</td>' \
+                  f'<td>{p.loss_imposter} / {p.loss_imposter_pct}</td>' \
+                  '</tr>'
+        yield '</table>'
@@ -0,0 +1,120 @@
+import logging
+from sqlite3 import Cursor
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger('repository.instrumentation')
+
+
+def _shape(parameters):
+    """A short description of bound parameters which does not include their values."""
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(parameters) + '}'
+    return f'({len(parameters)})'
+
+
+class QueryRecord:
+    __slots__ = ('sql', 'params', 'rows', 'duration', '_parameters', '_reported')
+
+    def __init__(self, sql: str, params: str, parameters=None):
+        self.sql = sql
+        self.params = params
+        self.rows = 0
+        self.duration = 0.0
+        self._parameters = parameters
+        self._reported = False
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+class QueryLog:
+    """The statements run through instrumented cursors during one unit of work, usually a single request.
+
+    Statements which take longer than ``slow_query_ms`` are logged together with their query plan.
+    """
+    def __init__(self, slow_query_ms: Optional[float] = None):
+        self.slow_query_ms = slow_query_ms
+        self.records: List[QueryRecord] = []
+
+    @property
+    def count(self):
+        return len(self.records)
+
+    @property
+    def duration_ms(self):
+        return sum(r.duration for r in self.records) * 1000
+
+    def server_timing(self):
+        return f'db;dur={self.duration_ms:.1f};desc="{self.count} queries"'
+
+    def add(self, cursor: Cursor, record: QueryRecord, elapsed: float, rows: int = 0):
+        record.duration += elapsed
+        record.rows += rows
+        if self.slow_query_ms is None or record._reported or record.duration_ms < self.slow_query_ms:
+            return
+        record._reported = True
+        plan = ''
+        if record._parameters is not None:
+            try:
+                explained = cursor.connection.execute('EXPLAIN QUERY PLAN ' + record.sql, record._parameters)
+                plan = '\n'.join(f'  {row[-1]}' for row in explained)
+            except Exception as e:
+                plan = f'  could not explain: {e}'
+        logger.warning(f'slow query ({record.duration_ms:.1f}ms, {record.rows} rows, params {record.params}): '
+                       f'{record.sql}\n{plan}')
+
+
+class InstrumentedCursor(Cursor):
+    """A cursor which reports every statement it runs, with timings and row counts, to its ``query_log``."""
+    query_log: QueryLog
+    _record: Optional[QueryRecord] = None
+
+    def _timed(self, method, rows, *args):
+        start = perf_counter()
+        result = method(*args)
+        if self._record is not None:
+            self.query_log.add(self, self._record, perf_counter() - start, rows(result))
+        return result
+
+    def _start(self, sql, params, parameters=None):
+        self._record = QueryRecord(sql, params, parameters)
+        self.query_log.records.append(self._record)
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, _shape(parameters), parameters)
+        return self._timed(super().execute, lambda _: max(self.rowcount, 0), sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        params = f'{len(seq_of_parameters)} x ' + (_shape(seq_of_parameters[0]) if seq_of_parameters else '()')
+        self._start(sql, params)
+        return self._timed(super().executemany, lambda _: max(self.rowcount, 0), sql, seq_of_parameters)
+
+    def fetchone(self):
+        return self._timed(super().fetchone, lambda row: 0 if row is None else 1)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        return self._timed(super().fetchmany, len, size)
+
+    def fetchall(self):
+        return self._timed(super().fetchall, len)
+
+    def __next__(self):
+        return self._timed(super().__next__, lambda _: 1)
+
+
+class DependencyTimings:
+    """How long one unit of work waited on each service other than the database, and how each call ended."""
+    def __init__(self):
+        self.records: List[Tuple[str, float, str]] = []
+
+    def add(self, name: str, duration: float, status: str):
+        self.records.append((name, duration, status))
+
+    def server_timing(self):
+        return ', '.join(f'{name};dur={duration * 1000:.1f};desc="{status}"'
+                         for name, duration, status in self.records)
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from sqlite3 import Connection
+from typing import Iterator, List
+
+logger = logging.getLogger('repository.migrations')
+
+
+def _unhex(text):
+    try:
+        return bytes.fromhex(text)
+    except (TypeError, ValueError):
+        return None
+
+
+class MigrationException(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.version}, {self.name!r})'
+
+    def read(self):
+        with open(self.path, 'br') as fp:
+            script = fp.read()
+        return script.decode('utf-8'), hashlib.blake2b(script).hexdigest()
+
+
+class Migrator:
+    """Brings a database up to the newest schema version.
+
+    The baseline schema file is version 1. Every ``NNNN_name.sql`` script in the migrations directory is applied in
+    order of its number, each in its own transaction. Applied versions are kept in ``PRAGMA user_version`` and in
+    the ``schema_migrations`` table together with the hash of the script that was run.
+    """
+    _file_pattern = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+    def __init__(self, schema_path: Path, migrations_path: Path):
+        self.schema_path = schema_path
+        self.migrations_path = migrations_path
+
+    def migrations(self) -> List[Migration]:
+        migrations = [Migration(1, 'baseline', self.schema_path)]
+        if self.migrations_path.is_dir():
+            for path in self.migrations_path.iterdir():
+                match = self._file_pattern.match(path.name)
+                if match is not None:
+                    migrations.append(Migration(int(match[1]), match[2], path))
+        migrations.sort(key=lambda m: m.version)
+        versions = [m.version for m in migrations]
+        if len(set(versions)) != len(versions):
+            raise MigrationException(f'duplicate migration versions {versions}')
+        return migrations
+
+    @classmethod
+    def version(cls, conn: Connection) -> int:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self, conn: Connection):
+        if sqlite3.sqlite_version_info < (3, 41, 0):
+            # unhex() is built in from SQLite 3.41 onwards.
+            conn.create_function('unhex', 1, _unhex, deterministic=True)
+        conn.execute('CREATE TABLE IF NOT EXISTS schema_migrations ('
+                     ' version    INTEGER PRIMARY KEY,'
+                     ' name       TEXT NOT NULL,'
+                     ' hash       TEXT NOT NULL,'
+                     ' applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)')
+        conn.commit()
+        version = self.version(conn)
+        applied = dict(conn.execute('SELECT version, hash FROM schema_migrations'))
+        for migration in self.migrations():
+            script, script_hash = migration.read()
+            if migration.version <= version:
+                if applied.get(migration.version, script_hash) != script_hash:
+                    logger.warning(f'{migration!r} changed after it was applied.')
+                continue
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                version = self.version(conn)
+                if migration.version <= version:
+                    # Another process applied it while this one waited for the write lock.
+                    conn.rollback()
+                    continue
+                if migration.version == 1 and self._has_baseline(conn):
+                    # Databases created before migrations existed already hold the baseline schema.
+                    script = ''
+                logger.info(f'applying {migration!r}')
+                for statement in self.statements(script):
+                    conn.execute(statement)
+                conn.execute('INSERT INTO schema_migrations (version, name, hash) VALUES (?, ?, ?)',
+                             (migration.version, migration.name, script_hash))
+                conn.execute(f'PRAGMA user_version = {migration.version}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            version = migration.version
+
+    @classmethod
+    def statements(cls, script: str) -> Iterator[str]:
+        """The statements of a script one at a time. Unlike executescript this does not commit the open
+        transaction."""
+        statement = ''
+        for line in script.splitlines(keepends=True):
+            statement += line
+            if sqlite3.complete_statement(statement):
+                yield statement
+                statement = ''
+        if sqlite3.complete_statement(statement + ';') and statement.strip().rstrip(';').strip():
+            yield statement
+
+    @classmethod
+    def _has_baseline(cls, conn: Connection):
+        row = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type == 'table' AND name == 'users'").fetchone()
+        return row[0] > 0
@@ -1,16 +1,23 @@
-import hashlib
 import logging
 import os
 import sqlite3
 from abc import ABC, abstractmethod
-from collections import Hashable
+from collections import deque
+from collections.abc import Hashable
+from contextlib import contextmanager
+from operator import itemgetter
 from pathlib import Path
 from sqlite3 import Connection, Cursor
-from threading import Semaphore
-from typing import Optional, Iterator
+from threading import Lock
+from typing import Optional, Iterator, Dict, Iterable, List, Callable, Set
+from weakref import WeakSet
 
 from uuid import uuid4, UUID
 
+from among_us_friends.instrumentation import InstrumentedCursor, QueryLog
+from among_us_friends.lru_cache import LruCache
+from among_us_friends.migrations import Migrator
+
 logger = logging.getLogger("repository")
 
 
@@ -22,6 +29,10 @@ class NotFoundException(AmongUsFriendsException):
     pass
 
 
+class SearchTermException(AmongUsFriendsException):
+    pass
+
+
 class RepositoryException(Exception):
     pass
 
@@ -30,12 +41,21 @@ class UnknownTypeException(RepositoryException):
     pass
 
 
+class BatchInsertException(RepositoryException):
+    def __init__(self, errors):
+        super().__init__('; '.join(f'row {index}: {error}' for index, error in errors))
+        self.errors = errors
+
+
 class Markable:
     def __init__(self):
         self._dirty = False
+        self._changed = set()
 
-    def mark(self):
+    def mark(self, *tables: str):
+        """Note that changes are about to be made, to ``tables`` if they are named."""
         self._dirty = True
+        self._changed.update(tables)
 
 
 class AmongUsConnection(ABC, Markable):
@@ -51,11 +71,85 @@ class AmongUsConnection(ABC, Markable):
     def rollback(self):
         raise NotImplementedError()
 
+    @abstractmethod
+    def identity(self, table: str, key):
+        raise NotImplementedError()
+
+    def rowid(self, table: str, uuid: UUID) -> int:
+        return self.identity(table, uuid).rowid
+
 
 class SqliteDao:
+    fetch_size = 256
+
     def __init__(self, connection: AmongUsConnection):
         self.conn = connection
 
+    def _stream(self, c: Cursor, row_type) -> Iterator:
+        """The rows of an executed cursor, fetched in batches of ``fetch_size``. The rows can only be read until the
+        repository is closed."""
+        try:
+            while True:
+                rows = c.fetchmany(self.fetch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield row_type(row)
+        finally:
+            c.close()
+
+    @contextmanager
+    def _savepoint(self, name: str):
+        """Roll back every change made in the block if it raises, leaving the rest of the transaction as it was."""
+        self.conn.mark()
+        c = self.conn.cursor()
+        if not c.connection.in_transaction:
+            c.execute('BEGIN')
+        c.execute(f'SAVEPOINT {name}')
+        try:
+            yield
+        except BaseException:
+            c.execute(f'ROLLBACK TO {name}')
+            raise
+        finally:
+            c.execute(f'RELEASE {name}')
+            c.close()
+
+    def _insert_many(self, table: str, columns: str, rows: List[tuple]) -> List[int]:
+        """Insert all rows with one executemany and return their rowids in order.
+
+        Either every row is inserted or none is. When rows are rejected, each one is reported with its index in a
+        BatchInsertException.
+        """
+        self.conn.mark()
+        c = self.conn.cursor()
+        c.execute(f'SELECT IFNULL(MAX(rowid), 0) + 1 FROM {table}')
+        first = c.fetchone()[0]
+        rows = [(rowid,) + row for rowid, row in enumerate(rows, start=first)]
+        statement = f'INSERT INTO {table} (rowid, {columns}) VALUES ({", ".join("?" * (columns.count(",") + 2))})'
+        if not c.connection.in_transaction:
+            c.execute('BEGIN')
+        c.execute('SAVEPOINT insert_many')
+        try:
+            c.executemany(statement, rows)
+        except sqlite3.IntegrityError:
+            c.execute('ROLLBACK TO insert_many')
+            errors = []
+            for index, row in enumerate(rows):
+                try:
+                    c.execute(statement, row)
+                except sqlite3.IntegrityError as e:
+                    errors.append((index, e))
+            c.execute('ROLLBACK TO insert_many')
+            raise BatchInsertException(errors) from None
+        except Exception:
+            c.execute('ROLLBACK TO insert_many')
+            raise
+        finally:
+            c.execute('RELEASE insert_many')
+            c.close()
+        return [row[0] for row in rows]
+
 
 class Lobby:
     def __init__(self, uuid: UUID, title: str, public: bool):
@@ -81,11 +175,22 @@ known_conversions = {
     'str': (str, str),
     'int': (int, int),
     'bool': (bool, lambda v: 1 if v else 0),
-    'uuid': (UUID, lambda v: v.hex)
+    'float': (float, float),
+    'uuid': (lambda v: UUID(bytes=v), lambda v: v.bytes)
 }
 
 
-def sqlite_row(name, fields, *, type_conversions=None, bases=None):
+# sqlite3 already returns TEXT and INTEGER columns as str and int, these need no decoding.
+passthrough_conversions = {str, int}
+
+
+def sqlite_row(name, fields, *, type_conversions=None, bases=None, readonly=False):
+    """Build a row class with one attribute per ``name:kind`` field.
+
+    Instances keep the raw row and decode a field the first time it is read, caching the result in a slot. With
+    ``readonly`` the class is a tuple of already decoded values instead, which is the smallest and fastest to read
+    but cannot be modified.
+    """
     conv = dict(known_conversions)
     if type_conversions is not None:
         conv.update(type_conversions)
@@ -93,8 +198,15 @@ def sqlite_row(name, fields, *, type_conversions=None, bases=None):
         fields = [(name, conv[kind]) for name, kind in (col.split(':') for col in fields.split(' '))]
     except KeyError as e:
         raise UnknownTypeException(str(e)) from None
+    bases = bases if bases is not None else []
+    if readonly:
+        return _readonly_row(name, fields, bases)
+    return _mutable_row(name, fields, bases)
 
+
+def _mutable_row(name, fields, bases):
     class SqliteRowPrototype(Hashable):
+        __slots__ = ('_row',)
         rowid: int
 
         def __init__(self, row):
@@ -113,36 +225,123 @@ def sqlite_row(name, fields, *, type_conversions=None, bases=None):
         def __hash__(self) -> int:
             return hash(self.rowid)
 
-    bases = [SqliteRowPrototype] + (bases if bases is not None else [])
+    def _get(index):
+        def func(self):
+            return self._row[index]
+        return func
 
-    def _get(index, deserializer):
+    def _get_cached(index, deserializer, slot):
         def func(self):
-            v = self._row[index]
-            return None if v is None else deserializer(v)
+            try:
+                return slot.__get__(self)
+            except AttributeError:
+                v = self._row[index]
+                v = None if v is None else deserializer(v)
+                slot.__set__(self, v)
+                return v
         return func
 
-    def _set(index, serializer):
+    def _set(index, serializer, slot):
         def func(self, val):
-            if val is not None:
-                val = serializer(val)
-            self._row[index] = val
+            if not isinstance(self._row, list):
+                self._row = list(self._row)
+            self._row[index] = None if val is None else serializer(val)
+            if slot is not None:
+                slot.__set__(self, val)
         return func
 
-    t = type(name, tuple(bases), {
-        name: property(fget=_get(index, des), fset=_set(index, ser))
-        for index, (name, (des, ser)) in enumerate(fields)})
+    cached = [name for name, (des, ser) in fields if des not in passthrough_conversions]
+    t = type(name, tuple([SqliteRowPrototype] + bases), {'__slots__': tuple('_' + name for name in cached)})
+    for index, (name, (des, ser)) in enumerate(fields):
+        if name in cached:
+            slot = t.__dict__['_' + name]
+            setattr(t, name, property(fget=_get_cached(index, des, slot), fset=_set(index, ser, slot)))
+        else:
+            setattr(t, name, property(fget=_get(index), fset=_set(index, ser, None)))
     return t
 
 
+def _readonly_row(name, fields, bases):
+    decoders = [None if des in passthrough_conversions else des for _, (des, _) in fields]
+
+    class SqliteRowPrototype(tuple):
+        __slots__ = ()
+        rowid: int
+
+        def __new__(cls, row):
+            if row is None:
+                raise ValueError('row was None')
+            return tuple.__new__(cls, [v if d is None or v is None else d(v) for v, d in zip(row, decoders)])
+
+        def __repr__(self):
+            return f'{self.__class__.__name__}(' + ', '.join(f'{k[0]}={v!r}' for k, v in zip(fields, self)) + ')'
+
+        def __eq__(self, other):
+            if self.__class__ is not other.__class__:
+                return False
+            return self.rowid == other.rowid
+
+        def __ne__(self, other):
+            return not self == other
+
+        def __hash__(self) -> int:
+            return hash(self.rowid)
+
+    return type(name, tuple([SqliteRowPrototype] + bases), {
+        '__slots__': (),
+        **{name: property(fget=itemgetter(index)) for index, (name, _) in enumerate(fields)}})
+
+
 SqliteGame = sqlite_row('SqliteGame', 'rowid:int room_id:int owner:int uuid:uuid title:str')
-SqliteLobby = sqlite_row('SqliteLobby', 'rowid:int uuid:uuid title:str anyone:bool')
+SqliteLobby = sqlite_row('SqliteLobby', 'rowid:int uuid:uuid title:str anyone:bool', readonly=True)
 SqliteMatch = sqlite_row('SqliteMatch', 'rowid:int room_id:int owner:int host:int uuid:uuid title:str end_at:str '
                                         'players:int mode:str map:str result:str network:str')
-SqliteRoom = sqlite_row('SqliteRoom', 'rowid:int lobby:int uuid:uuid title:str')
-SqliteUser = sqlite_row('SqliteUser', 'rowid:int uuid:uuid username:str password_hash:str')
+SqliteRoom = sqlite_row('SqliteRoom', 'rowid:int lobby:int uuid:uuid title:str', readonly=True)
+SqliteUser = sqlite_row('SqliteUser', 'rowid:int uuid:uuid username:str password_hash:str', readonly=True)
 SqliteUser.secure = property(lambda self: bool(self.password_hash))
 SqliteResult = sqlite_row('SqluteResult', 'rowid:int matchid:int user_id:int uuid:uuid r_time:str platform:str '
-                                          'color:str imposter:bool victory:bool death:bool comments:str')
+                                          'color:str imposter:bool victory:bool death:bool comments:str',
+                          readonly=True)
+SqliteMatchResult = sqlite_row('SqliteMatchResult', 'match_id:int end_at:str players:int mode:str map:str network:str '
+                                                    'host:str imposters:int username:str platform:str color:str '
+                                                    'imposter:bool victory:bool',
+                               readonly=True)
+SqliteMatchExport = sqlite_row('SqliteMatchExport', 'rowid:int title:str end_at:str players:int mode:str map:str '
+                                                    'result:str network:str host:str owner:str',
+                               readonly=True)
+SqliteResultExport = sqlite_row('SqliteResultExport', 'rowid:int r_time:str match_title:str username:str platform:str '
+                                                      'color:str imposter:bool victory:bool death:bool comments:str',
+                                readonly=True)
+SqliteLeaderboardEntry = sqlite_row('SqliteLeaderboardEntry', 'value:float uuid:uuid username:str total_matches:int '
+                                                              'times_imposter:int deviation:float wins_crew:int '
+                                                              'wins_imposter:int loss_crew:int loss_imposter:int '
+                                                              'one_imposter:int two_imposters:int three_imposters:int',
+                                    readonly=True)
+
+
+class IdentityMap:
+    """Hydrated rows of the users, rooms and lobbies tables, reachable by uuid and by rowid.
+
+    The rows are shared by every repository of the pool, so their row types are read-only.
+    """
+    row_types = {
+        'lobbies': SqliteLobby,
+        'rooms': SqliteRoom,
+        'users': SqliteUser,
+    }
+
+    def __init__(self, capacity: int = 4096):
+        self._cache = LruCache(capacity)
+
+    def get(self, table: str, key):
+        return self._cache.get((table, key))
+
+    def put(self, table: str, row):
+        self._cache.put((table, row.uuid), row)
+        self._cache.put((table, row.rowid), row)
+
+    def clear(self):
+        self._cache.clear()
 
 
 class GameDao(SqliteDao):
@@ -150,32 +349,27 @@ class GameDao(SqliteDao):
         c = self.conn.cursor()
         u = uuid4()
         self.conn.mark()
-        c.execute('INSERT INTO games (room_id, owner, uuid, title) VALUES ('
-                  '  (SELECT rowid FROM rooms WHERE uuid == ?),'
-                  '  (SELECT rowid FROM users WHERE uuid == ?),'
-                  '  ?, ?)',
-                  (room_id.hex, owner.uuid.hex, u.hex, title))
+        c.execute('INSERT INTO games (room_id, owner, uuid, title) VALUES (?, ?, ?, ?)',
+                  (self.conn.rowid('rooms', room_id), self.conn.rowid('users', owner.uuid), u.bytes, title))
         return u
 
     def delete_by_uuid(self, uuid: UUID):
         c = self.conn.cursor()
         self.conn.mark()
-        c.execute('DELETE FROM games WHERE uuid == ?', (uuid.hex,))
+        c.execute('DELETE FROM games WHERE uuid == ?', (uuid.bytes,))
         c.close()
 
     def get_by_uuid(self, uuid: UUID):
         c = self.conn.cursor()
-        c.execute('SELECT * FROM games WHERE uuid == ?', (uuid.hex,))
+        c.execute('SELECT * FROM games WHERE uuid == ?', (uuid.bytes,))
         row = c.fetchone()
         c.close()
         return SqliteGame(row)
 
     def list_for_room(self, room: Room):
         c = self.conn.cursor()
-        c.execute('SELECT * FROM games WHERE room_id == (SELECT rowid FROM rooms WHERE uuid == ?)', (room.uuid.hex,))
-        rows = c.fetchall()
-        c.close()
-        return (SqliteGame(row) for row in rows)
+        c.execute('SELECT * FROM games WHERE room_id == ?', (self.conn.rowid('rooms', room.uuid),))
+        return self._stream(c, SqliteGame)
 
 
 class LobbyDao(SqliteDao):
@@ -184,35 +378,43 @@ class LobbyDao(SqliteDao):
         c = self.conn.cursor()
         self.conn.mark()
         c.execute('INSERT INTO lobbies (uuid, title, anyone) VALUES (?, ?, ?)',
-                  (uuid.hex, lobby_title, public))
+                  (uuid.bytes, lobby_title, public))
         c.close()
         return Lobby(uuid, lobby_title, public)
 
     def get_by_rowid(self, rowid):
-        c = self.conn.cursor()
-        c.execute('SELECT * FROM lobbies WHERE rowid == ?', (rowid,))
-        row = c.fetchone()
-        c.close()
-        return SqliteLobby(row)
+        return self.conn.identity('lobbies', rowid)
 
     def list(self):
         c = self.conn.cursor()
         c.execute('SELECT * FROM lobbies')
-        rows = c.fetchall()
-        c.close()
-        return (SqliteLobby(r) for r in rows)
+        return self._stream(c, SqliteLobby)
 
     def require_lobby(self, lobby_id: UUID):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM lobbies WHERE uuid == ? LIMIT 1", (lobby_id.hex,))
-        row = c.fetchone()
-        c.close()
-        if row is None:
-            raise NotFoundException(lobby_id)
-        return SqliteLobby(row)
+        return self.conn.identity('lobbies', lobby_id)
+
+
+FTS_MIN_LENGTH = 3
+
+
+def fts_query(text: str) -> str:
+    """An FTS5 query for results_fts matching comments which contain every word of the text. Words are quoted, so
+    the text is never parsed as query syntax. The trigram index cannot match words shorter than three characters,
+    they raise SearchTermException instead of silently matching nothing."""
+    words = text.split()
+    if not words or any(len(word) < FTS_MIN_LENGTH for word in words):
+        raise SearchTermException(f'search words must be at least {FTS_MIN_LENGTH} characters long: {text!r}')
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+SqliteCommentHit = sqlite_row('SqliteCommentHit', 'uuid:uuid match_uuid:uuid match_title:str end_at:str username:str '
+                                                  'comments:str rank:float',
+                              readonly=True)
 
 
 class PandaMatch(SqliteMatch):
+    __slots__ = ('imposters', 'panda_count')
+
     def __init__(self, rows, imposters, panda_count):
         super(PandaMatch, self).__init__(rows)
         self.imposters = imposters
@@ -226,42 +428,64 @@ class MatchDao(SqliteDao):
         self.conn.mark()
         c.execute('INSERT INTO matches '
                   '(room_id, owner, host, uuid, title, end_at, players, mode, map, result, network) '
-                  'VALUES ('
-                  '(SELECT rowid FROM rooms WHERE uuid == ?), '
-                  '(SELECT rowid FROM users WHERE uuid == ?), '
-                  '(SELECT rowid FROM users WHERE uuid == ?), '
-                  '?, ?, ?, ?, ?, ?, ?, ?)',
-                  (match.room.uuid.hex, match.owner.uuid.hex, match.host.uuid.hex, uuid.hex, match.title, match.end_at,
+                  'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                  (self.conn.rowid('rooms', match.room.uuid), self.conn.rowid('users', match.owner.uuid),
+                   self.conn.rowid('users', match.host.uuid), uuid.bytes, match.title, match.end_at,
                    match.players, match.mode, match.map, match.result, match.network))
         c.close()
         return c.lastrowid
 
-    def list_for_room(self, room, mode='%'):
+    def create_many(self, matches: Iterable) -> List[int]:
+        return self._insert_many(
+            'matches', 'room_id, owner, host, uuid, title, end_at, players, mode, map, result, network',
+            [(self.conn.rowid('rooms', match.room.uuid), self.conn.rowid('users', match.owner.uuid),
+              self.conn.rowid('users', match.host.uuid), uuid4().bytes, match.title, match.end_at,
+              match.players, match.mode, match.map, match.result, match.network)
+             for match in matches])
+
+    def list_for_room(self, room, mode='%', keyword='panda'):
+        """Every match in the room with its imposter names and the number of results whose comments mention the
+        keyword, gathered in a single statement."""
         c = self.conn.cursor()
-        c.execute('SELECT * FROM matches WHERE'
-                  ' room_id == (SELECT rowid FROM rooms WHERE uuid == ?) AND'
-                  ' mode LIKE ?',
-                  (room.uuid.hex, mode))
-        rows = c.fetchall()
-        c.close()
-        for row in rows:
-            imposters = ', '.join(u.username for u in self.imposters_for_match(row[0]))
-            grep = self.grep(row[0], 'panda')
-            yield PandaMatch(row, imposters, grep)
+        c.execute("SELECT m.*, IFNULL(GROUP_CONCAT(u.username, ', '), ''),"
+                  '  IFNULL(SUM(r.rowid IN (SELECT rowid FROM results_fts WHERE results_fts MATCH ?)), 0)'
+                  ' FROM matches AS m'
+                  ' LEFT JOIN results AS r ON r.match_id == m.rowid'
+                  ' LEFT JOIN users AS u ON u.rowid == r.user_id AND r.imposter == 1'
+                  ' WHERE m.room_id == ? AND m.mode LIKE ?'
+                  ' GROUP BY m.rowid',
+                  (fts_query(keyword), self.conn.rowid('rooms', room.uuid), mode))
+        return self._stream(c, lambda row: PandaMatch(row[:-2], row[-2], row[-1]))
+
+    def export_for_room(self, room, mode='%', since: str = '', player=None, after: int = 0) \
+            -> Iterator[SqliteMatchExport]:
+        """The room's matches with rowids after ``after`` in rowid order, with their host and owner names. Only
+        matches which ended at or after ``since`` and, with a ``player``, those the player has a result in."""
+        player_rowid = None if player is None else player.rowid
+        c = self.conn.cursor()
+        c.execute('SELECT m.rowid, m.title, m.end_at, m.players, m.mode, m.map, m.result, m.network, h.username,'
+                  '  o.username'
+                  ' FROM matches AS m'
+                  ' JOIN users AS h ON h.rowid == m.host'
+                  ' JOIN users AS o ON o.rowid == m.owner'
+                  ' WHERE m.room_id == ? AND m.mode LIKE ? AND m.end_at >= ? AND m.rowid > ?'
+                  '  AND (?5 IS NULL OR EXISTS (SELECT 1 FROM results WHERE match_id == m.rowid AND user_id == ?5))'
+                  ' ORDER BY m.rowid',
+                  (self.conn.rowid('rooms', room.uuid), mode, since, after, player_rowid))
+        return self._stream(c, SqliteMatchExport)
 
     def imposters_for_match(self, rowid: int):
         c = self.conn.cursor()
         c.execute('SELECT * FROM users WHERE rowid IN ('
                   '  SELECT user_id FROM results WHERE match_id == ? AND imposter == 1)',
                   (rowid,))
-        rows = c.fetchall()
-        c.close()
-        return (SqliteUser(r) for r in rows)
+        return self._stream(c, SqliteUser)
 
     def grep(self, rowid:int, pattern: str):
         c = self.conn.cursor()
-        c.execute('SELECT COUNT(*) FROM results WHERE match_id == ? AND comments LIKE ? COLLATE NOCASE',
-                  (rowid, '%' + pattern + '%'))
+        c.execute('SELECT COUNT(*) FROM results_fts JOIN results AS r ON r.rowid == results_fts.rowid'
+                  ' WHERE results_fts MATCH ? AND r.match_id == ?',
+                  (fts_query(pattern), rowid))
         row = c.fetchone()
         c.close()
         return f'{row[0]}'
@@ -270,33 +494,174 @@ class MatchDao(SqliteDao):
 class ResultDao(SqliteDao):
     def create(self, result):
         uuid = uuid4()
-        c = self.conn.cursor()
-        self.conn.mark()
-        c.execute('INSERT INTO results (match_id, user_id, uuid, r_time, platform, color, imposter, victory, death, comments)'
-                  'VALUES (?, (SELECT rowid FROM users WHERE uuid == ?), ?, ?, ?, ?, ?, ?, ?, ?)',
-                  (result.match_rowid, result.user.uuid.hex, uuid.hex, result.timestamp, result.platform, result.color,
-                   result.imposter, result.victory, result.death, result.comments))
-        c.close()
+        stats = StatsDao(self.conn)
+        # The match's stats are retracted and applied again around the insert, all undone if the insert fails.
+        with self._savepoint('create_result'):
+            stats.retract([result.match_rowid])
+            c = self.conn.cursor()
+            c.execute('INSERT INTO results (match_id, user_id, uuid, r_time, platform, color, imposter, victory, death,'
+                      ' comments) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                      (result.match_rowid, self.conn.rowid('users', result.user.uuid), uuid.bytes, result.timestamp,
+                       result.platform, result.color, result.imposter, result.victory, result.death, result.comments))
+            c.close()
+            stats.apply([result.match_rowid])
         return c.lastrowid
 
+    def create_many(self, results: Iterable) -> List[int]:
+        results = list(results)
+        match_rowids = {result.match_rowid for result in results}
+        stats = StatsDao(self.conn)
+        with self._savepoint('create_results'):
+            stats.retract(match_rowids)
+            rowids = self._insert_many(
+                'results', 'match_id, user_id, uuid, r_time, platform, color, imposter, victory, death, comments',
+                [(result.match_rowid, self.conn.rowid('users', result.user.uuid), uuid4().bytes, result.timestamp,
+                  result.platform, result.color, result.imposter, result.victory, result.death, result.comments)
+                 for result in results])
+            stats.apply(match_rowids)
+        return rowids
+
     def counts_by_match_rowid_for_room(self, room):
         c = self.conn.cursor()
         c.execute('SELECT match_id, COUNT(*) FROM results WHERE match_id IN'
-                  '  (SELECT rowid FROM matches WHERE room_id == '
-                  '    (SELECT rowid FROM rooms WHERE uuid == ?)'
-                  '  ) GROUP BY match_id',
-                  (room.uuid.hex,))
+                  '  (SELECT rowid FROM matches WHERE room_id == ?)'
+                  '  GROUP BY match_id',
+                  (self.conn.rowid('rooms', room.uuid),))
         counts_by_match_rowid = c.fetchall()
         c.close()
         return counts_by_match_rowid
 
+    def imposter_stats_for_room(self, room, mode='%', group_by='user'):
+        """One row of ImposterStat counters per player or color over the room's matches.
+
+        Columns are key, title, total matches, times imposter, deviation, crew wins, imposter wins, crew losses,
+        imposter losses, and times imposter in matches with one, two and three imposters.
+        """
+        key, title, join = {
+            'user': ('r.user_id', 'u.username', 'JOIN users AS u ON u.rowid == r.user_id'),
+            'color': ('r.color', 'r.color', ''),
+        }[group_by]
+        c = self.conn.cursor()
+        c.execute('WITH room_matches AS ('
+                  '  SELECT m.rowid AS match_id, m.players, SUM(r.imposter) AS imposters'
+                  '  FROM matches AS m JOIN results AS r ON r.match_id == m.rowid'
+                  '  WHERE m.room_id == ? AND m.mode LIKE ?'
+                  '  GROUP BY m.rowid)'
+                  f' SELECT {key}, {title}, COUNT(*), SUM(r.imposter),'
+                  '  TOTAL(CASE WHEN r.imposter THEN 1.0 / rm.imposters ELSE -1.0 / (rm.players - rm.imposters) END),'
+                  '  SUM(NOT r.imposter AND r.victory), SUM(r.imposter AND r.victory),'
+                  '  SUM(NOT r.imposter AND NOT r.victory), SUM(r.imposter AND NOT r.victory),'
+                  '  SUM(r.imposter AND rm.imposters == 1), SUM(r.imposter AND rm.imposters == 2),'
+                  '  SUM(r.imposter AND rm.imposters == 3)'
+                  f' FROM results AS r JOIN room_matches AS rm ON rm.match_id == r.match_id {join}'
+                  f' GROUP BY {key}',
+                  (self.conn.rowid('rooms', room.uuid), mode))
+        return self._stream(c, tuple)
+
+    def participation_for_room(self, room, mode='%', after: int = 0):
+        """The (rowid, match_id, players, user_id, imposter, victory, death) of the room's results with a rowid
+        greater than ``after``, in rowid order."""
+        c = self.conn.cursor()
+        c.execute('SELECT r.rowid, r.match_id, m.players, r.user_id, r.imposter, r.victory, r.death'
+                  ' FROM results AS r JOIN matches AS m ON m.rowid == r.match_id'
+                  ' WHERE m.room_id == ? AND m.mode LIKE ? AND r.rowid > ?'
+                  ' ORDER BY r.rowid',
+                  (self.conn.rowid('rooms', room.uuid), mode, after))
+        return self._stream(c, tuple)
+
+    def list_with_matches_for_room(self, room, mode='%', since: str = '', last: int = -1) \
+            -> Iterator[SqliteMatchResult]:
+        """Every result in the room's matches, joined with its match, host name, imposter count and username, in
+        order of the matches' end.
+
+        Only matches which ended at or after ``since`` are included, and of those only the ``last`` ones if it is
+        not negative.
+        """
+        return self._stream(self._with_matches_for_room(room, mode, since, last), SqliteMatchResult)
+
+    def columns_with_matches_for_room(self, room, mode='%', since: str = '', last: int = -1) -> List[tuple]:
+        """The same results as list_with_matches_for_room as one tuple per field of SqliteMatchResult, undecoded."""
+        c = self._with_matches_for_room(room, mode, since, last)
+        try:
+            return list(zip(*c.fetchall()))
+        finally:
+            c.close()
+
+    def _with_matches_for_room(self, room, mode: str, since: str, last: int) -> Cursor:
+        room_rowid = self.conn.rowid('rooms', room.uuid)
+        c = self.conn.cursor()
+        c.execute('SELECT m.rowid, m.end_at, m.players, m.mode, m.map, m.network, h.username,'
+                  '  SUM(r.imposter) OVER (PARTITION BY r.match_id), u.username, r.platform, r.color, r.imposter,'
+                  '  r.victory'
+                  ' FROM results AS r'
+                  ' JOIN matches AS m ON m.rowid == r.match_id'
+                  ' JOIN users AS h ON h.rowid == m.host'
+                  ' JOIN users AS u ON u.rowid == r.user_id'
+                  ' WHERE m.room_id == ? AND m.mode LIKE ? AND m.end_at >= ? AND m.rowid IN'
+                  '  (SELECT rowid FROM matches WHERE room_id == ? AND mode LIKE ? AND end_at >= ?'
+                  '   ORDER BY end_at DESC, rowid DESC LIMIT ?)'
+                  ' ORDER BY m.end_at, m.rowid',
+                  (room_rowid, mode, since, room_rowid, mode, since, last))
+        return c
+
+    def export_for_room(self, room, mode='%', since: str = '', player=None, after: int = 0) \
+            -> Iterator[SqliteResultExport]:
+        """The results in the room's matches with rowids after ``after`` in rowid order, with their match title and
+        username. Filtered by match like MatchDao.export_for_room, so a player's matches keep all their results."""
+        player_rowid = None if player is None else player.rowid
+        c = self.conn.cursor()
+        c.execute('SELECT r.rowid, r.r_time, m.title, u.username, r.platform, r.color, r.imposter, r.victory, r.death,'
+                  '  r.comments'
+                  ' FROM results AS r'
+                  ' JOIN matches AS m ON m.rowid == r.match_id'
+                  ' JOIN users AS u ON u.rowid == r.user_id'
+                  ' WHERE m.room_id == ? AND m.mode LIKE ? AND m.end_at >= ? AND r.rowid > ?'
+                  '  AND (?5 IS NULL OR EXISTS (SELECT 1 FROM results WHERE match_id == m.rowid AND user_id == ?5))'
+                  ' ORDER BY r.rowid',
+                  (self.conn.rowid('rooms', room.uuid), mode, since, after, player_rowid))
+        return self._stream(c, SqliteResultExport)
+
+    def keyword_counts_for_room(self, room, terms: Iterable[str], mode='%', by='match'):
+        """The (term, key, title, count) of the results mentioning each term, per match or per user of the room.
+        Keys are match or user uuids, titles the match title or username."""
+        key, title, join = {
+            'match': ('m.uuid', 'm.title', ''),
+            'user': ('u.uuid', 'u.username', 'JOIN users AS u ON u.rowid == r.user_id'),
+        }[by]
+        room_rowid = self.conn.rowid('rooms', room.uuid)
+        queries = [(term, fts_query(term)) for term in terms]
+        c = self.conn.cursor()
+        for term, query in queries:
+            c.execute(f'SELECT {key}, {title}, COUNT(*)'
+                      ' FROM results_fts JOIN results AS r ON r.rowid == results_fts.rowid'
+                      f' JOIN matches AS m ON m.rowid == r.match_id {join}'
+                      ' WHERE results_fts MATCH ? AND m.room_id == ? AND m.mode LIKE ?'
+                      f' GROUP BY {key}',
+                      (query, room_rowid, mode))
+            for row in c.fetchall():
+                yield (term, UUID(bytes=row[0])) + row[1:]
+        c.close()
+
+    def search_comments(self, text: str, room=None, limit=20) -> Iterator[SqliteCommentHit]:
+        """The results whose comments contain every word of the text, in the room or in every room, best match first.
+        """
+        room_rowid = self.conn.rowid('rooms', room.uuid) if room is not None else None
+        c = self.conn.cursor()
+        c.execute('SELECT r.uuid, m.uuid, m.title, m.end_at, u.username, r.comments, results_fts.rank'
+                  ' FROM results_fts'
+                  ' JOIN results AS r ON r.rowid == results_fts.rowid'
+                  ' JOIN matches AS m ON m.rowid == r.match_id'
+                  ' JOIN users AS u ON u.rowid == r.user_id'
+                  ' WHERE results_fts MATCH ? AND (? IS NULL OR m.room_id == ?)'
+                  ' ORDER BY results_fts.rank LIMIT ?',
+                  (fts_query(text), room_rowid, room_rowid, limit))
+        return self._stream(c, SqliteCommentHit)
+
     def list_for_match(self, match) -> Iterator[SqliteResult]:
         c = self.conn.cursor()
         c.execute('SELECT * FROM results WHERE match_id == (SELECT rowid FROM matches WHERE uuid == ?)',
-                  (match.uuid.hex,))
-        rows = c.fetchall()
-        c.close()
-        return (SqliteResult(r) for r in rows)
+                  (match.uuid.bytes,))
+        return self._stream(c, SqliteResult)
 
 
 class RoomDao(SqliteDao):
@@ -304,67 +669,154 @@ class RoomDao(SqliteDao):
         uuid = uuid4()
         c = self.conn.cursor()
         self.conn.mark()
-        c.execute('INSERT INTO rooms (lobby_id, uuid, title) VALUES ('
-                  '(SELECT rowid FROM lobbies WHERE uuid == ?),'
-                  '?, ?)', (lobby.uuid.hex, uuid.hex, room_title,))
+        c.execute('INSERT INTO rooms (lobby_id, uuid, title) VALUES (?, ?, ?)',
+                  (self.conn.rowid('lobbies', lobby.uuid), uuid.bytes, room_title,))
         c.close()
         return Room(uuid, room_title)
 
     def get_by_rowid(self, rowid: int):
-        c = self.conn.cursor()
-        c.execute('SELECT * FROM rooms WHERE rowid == ?', (rowid,))
-        row = c.fetchone()
-        c.close()
-        return SqliteRoom(row)
+        return self.conn.identity('rooms', rowid)
 
     def list(self):
         c = self.conn.cursor()
         c.execute("SELECT * FROM rooms")
-        rows = c.fetchall()
-        c.close()
-        return (SqliteRoom(r) for r in rows)
+        return self._stream(c, SqliteRoom)
 
     def list_for_lobby(self, lobby: Lobby):
         c = self.conn.cursor()
-        c.execute('SELECT * FROM rooms WHERE lobby_id == '
-                  '(SELECT rowid FROM lobbies WHERE uuid == ?)', (lobby.uuid.hex,))
-        rows = c.fetchall()
-        c.close()
-        return (SqliteRoom(r) for r in rows)
+        c.execute('SELECT * FROM rooms WHERE lobby_id == ?', (self.conn.rowid('lobbies', lobby.uuid),))
+        return self._stream(c, SqliteRoom)
 
     def require_room(self, room_id: UUID):
+        return self.conn.identity('rooms', room_id)
+
+    def version(self, room):
+        """The (version, updated_at) of the room's data, bumped by triggers on every change to the room, its matches or
+        their results."""
         c = self.conn.cursor()
-        c.execute("SELECT * FROM rooms WHERE uuid == ? LIMIT 1", (room_id.hex,))
+        c.execute('SELECT version, updated_at FROM room_versions WHERE room_id == ?',
+                  (self.conn.rowid('rooms', room.uuid),))
         row = c.fetchone()
         c.close()
-        if row is None:
-            raise NotFoundException(room_id)
-        return SqliteRoom(row)
+        return row if row is not None else (0, None)
+
+
+class StatsDao(SqliteDao):
+    """Maintains the room_user_stats and room_color_stats tables, which hold the ImposterStat counters of every
+    player and color per room and mode.
+
+    Adding a result changes the number of imposters in its match, and with it the counters of every other result of
+    that match. Writers therefore retract the contribution of the matches they are about to change and apply it again
+    afterwards, in the same transaction.
+    """
+    _tables = {
+        'user': ('room_user_stats', 'user_id'),
+        'color': ('room_color_stats', 'color'),
+    }
+    _counters = ('total_matches', 'times_imposter', 'deviation', 'wins_crew', 'wins_imposter', 'loss_crew',
+                 'loss_imposter', 'one_imposter', 'two_imposters', 'three_imposters')
+
+    def _add(self, sign: int, match_rowids: Optional[Iterable[int]]):
+        self.conn.mark()
+        where = ''
+        if match_rowids is not None:
+            where = 'WHERE m.rowid IN (' + ', '.join(str(int(rowid)) for rowid in match_rowids) + ')'
+        c = self.conn.cursor()
+        for table, key in self._tables.values():
+            c.execute('WITH match_imposters AS ('
+                      '  SELECT m.rowid AS match_id, m.room_id, m.mode, m.players, SUM(r.imposter) AS imposters'
+                      '  FROM matches AS m JOIN results AS r ON r.match_id == m.rowid'
+                      f' {where} GROUP BY m.rowid)'
+                      f' INSERT INTO {table} (room_id, mode, {key}, {", ".join(self._counters)})'
+                      f' SELECT mi.room_id, mi.mode, r.{key}, ? * COUNT(*), ? * SUM(r.imposter),'
+                      '  ? * TOTAL(CASE WHEN r.imposter THEN 1.0 / mi.imposters'
+                      '                 ELSE -1.0 / (mi.players - mi.imposters) END),'
+                      '  ? * SUM(NOT r.imposter AND r.victory), ? * SUM(r.imposter AND r.victory),'
+                      '  ? * SUM(NOT r.imposter AND NOT r.victory), ? * SUM(r.imposter AND NOT r.victory),'
+                      '  ? * SUM(r.imposter AND mi.imposters == 1), ? * SUM(r.imposter AND mi.imposters == 2),'
+                      '  ? * SUM(r.imposter AND mi.imposters == 3)'
+                      ' FROM results AS r JOIN match_imposters AS mi ON mi.match_id == r.match_id'
+                      f' WHERE true GROUP BY mi.room_id, mi.mode, r.{key}'
+                      f' ON CONFLICT (room_id, mode, {key}) DO UPDATE SET '
+                      + ', '.join(f'{counter} = {counter} + excluded.{counter}' for counter in self._counters),
+                      (sign,) * len(self._counters))
+        c.close()
+
+    def apply(self, match_rowids: Iterable[int]):
+        self._add(1, match_rowids)
+
+    def retract(self, match_rowids: Iterable[int]):
+        self._add(-1, match_rowids)
+
+    def rebuild(self):
+        """Recompute every counter from the results table."""
+        self.conn.mark()
+        c = self.conn.cursor()
+        for table, _ in self._tables.values():
+            c.execute(f'DELETE FROM {table}')
+        c.close()
+        self._add(1, None)
+
+    # Leaderboard rankings, each matching the expression of one of leaderboard_stats' indexes.
+    rankings = {
+        'win_rate': '(wins_crew + wins_imposter) * 1.0 / total_matches',
+        'imposter_win_rate': 'wins_imposter * 1.0 / times_imposter',
+        'deviation': 'deviation',
+    }
+
+    def leaderboard(self, lobby: Optional[Lobby] = None, ranking='win_rate', min_games=1, limit=20,
+                    after: Optional[tuple] = None) -> Iterator[SqliteLeaderboardEntry]:
+        """The top ``limit`` users of the lobby, or of every lobby, by ``ranking`` among those with at least
+        ``min_games`` matches.
+
+        Pages continue after the (value, user uuid) of the previous page's last entry.
+        """
+        value = self.rankings[ranking]
+        params = [self.conn.rowid('lobbies', lobby.uuid) if lobby is not None else 0, min_games, limit]
+        keyset = ''
+        if after is not None:
+            # Spelled out rather than as a row value comparison, which SQLite does not use as a bound on the index.
+            keyset = f' AND {value} <= ?4 AND ({value} < ?4 OR user_id < ?5)'
+            params += [after[0], self.conn.rowid('users', after[1])]
+        c = self.conn.cursor()
+        c.execute(f'SELECT {value}, u.uuid, u.username, ' + ', '.join(f's.{counter}' for counter in self._counters)
+                  + ' FROM leaderboard_stats AS s JOIN users AS u ON u.rowid == s.user_id'
+                  f' WHERE lobby_id == ?1 AND {value} IS NOT NULL AND total_matches >= ?2{keyset}'
+                  f' ORDER BY {value} DESC, user_id DESC LIMIT ?3',
+                  params)
+        return self._stream(c, SqliteLeaderboardEntry)
+
+    def imposter_stats_for_room(self, room, mode='%', group_by='user'):
+        """The same rows as ResultDao.imposter_stats_for_room, read from the maintained counters."""
+        table, key = self._tables[group_by]
+        title, join = ('u.username', 'JOIN users AS u ON u.rowid == s.user_id') if group_by == 'user' else ('s.color', '')
+        c = self.conn.cursor()
+        c.execute(f'SELECT s.{key}, {title}, '
+                  + ', '.join(f'SUM(s.{counter})' for counter in self._counters)
+                  + f' FROM {table} AS s {join}'
+                  ' WHERE s.room_id == ? AND s.mode LIKE ?'
+                  f' GROUP BY s.{key} HAVING SUM(s.total_matches) > 0',
+                  (self.conn.rowid('rooms', room.uuid), mode))
+        return self._stream(c, tuple)
 
 
 class UserDao(SqliteDao):
     def create(self, username, password):
         uuid = uuid4()
         c = self.conn.cursor()
-        self.conn.mark()
+        self.conn.mark('users')
         c.execute('INSERT INTO users (uuid, username, password) VALUES (?, ?, ?)',
-                  (uuid.hex, username, password))
+                  (uuid.bytes, username, password))
         c.close()
         return User(uuid, username, password)
 
     def get_by_rowid(self, rowid):
-        c = self.conn.cursor()
-        c.execute('SELECT * FROM users WHERE rowid == ?', (rowid,))
-        row = c.fetchone()
-        c.close()
-        return SqliteUser(row)
+        return self.conn.identity('users', rowid)
 
     def list(self):
         c = self.conn.cursor()
         c.execute('SELECT * FROM users')
-        rows = c.fetchall()
-        c.close()
-        return (SqliteUser(row) for row in rows)
+        return self._stream(c, SqliteUser)
 
     def require_username(self, username: str):
         c = self.conn.cursor()
@@ -376,81 +828,187 @@ class UserDao(SqliteDao):
         return SqliteUser(row)
 
     def require_uuid(self, uuid: UUID):
-        c = self.conn.cursor()
-        c.execute('SELECT * FROM users WHERE uuid == ?', (uuid.hex,))
-        row = c.fetchone()
-        c.close()
-        if row is None:
-            raise NotFoundException(uuid)
-        return SqliteUser(row)
+        return self.conn.identity('users', uuid)
+
+
+class ConnectionPool:
+    """Warm SQLite connections for a single database file.
+
+    The database runs in WAL mode. The writer connection is handed out to one repository at a time, while any number
+    of read-only connections, opened with a ``mode=ro`` URI, can read alongside it. Each reader holds one snapshot of
+    the database from the moment it is acquired until it is released. Up to ``idle_readers`` readers are kept open
+    between uses.
+    """
+    _shared: Dict[Path, 'ConnectionPool'] = {}
+    _shared_lock = Lock()
+    _commit_listeners: List[Callable[[Set[str]], None]] = []
+
+    def __init__(self, db_path: Path, schema_path: Path, idle_readers: int = 8):
+        self.db_path = db_path
+        self.schema_path = schema_path
+        self.idle_readers = idle_readers
+        self._writer_lock = Lock()
+        self._idle_lock = Lock()
+        self._idle = deque()
+        self.identities = IdentityMap()
+        self._writer = self._connect()
+        try:
+            self._writer.execute('PRAGMA journal_mode=WAL')
+            Migrator(schema_path, schema_path.parent / 'migrations').migrate(self._writer)
+        except Exception as e:
+            logger.exception(e)
+            self._writer.close()
+            raise
+
+    @classmethod
+    def shared(cls, db_path: Path, schema_path: Path) -> 'ConnectionPool':
+        key = Path(db_path).resolve()
+        with cls._shared_lock:
+            pool = cls._shared.get(key)
+            if pool is None:
+                pool = cls._shared[key] = cls(db_path, schema_path)
+            return pool
+
+    @classmethod
+    def on_commit(cls, listener: Callable[[Set[str]], None]):
+        """Call ``listener`` with the names of the tables changed by each commit which named any."""
+        cls._commit_listeners.append(listener)
+
+    def committed(self, tables: Set[str]):
+        for listener in self._commit_listeners:
+            listener(tables)
+
+    def _connect(self, readonly=False) -> Connection:
+        if readonly:
+            return sqlite3.connect(f'{Path(self.db_path).resolve().as_uri()}?mode=ro', uri=True,
+                                   check_same_thread=False)
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def acquire(self, readonly: bool) -> Connection:
+        if not readonly:
+            self._writer_lock.acquire()
+            return self._writer
+        with self._idle_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect(readonly=True)
+        # The snapshot is taken by the first read of the transaction.
+        conn.execute('BEGIN')
+        conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        return conn
+
+    def release(self, conn: Connection, readonly: bool):
+        try:
+            conn.rollback()
+        finally:
+            if readonly:
+                with self._idle_lock:
+                    if len(self._idle) < self.idle_readers:
+                        self._idle.append(conn)
+                        conn = None
+                if conn is not None:
+                    conn.close()
+            else:
+                self._writer_lock.release()
 
 
 class Repository(AmongUsConnection):
-    def __init__(self, db_path: Path, schema_path: Path):
+    def __init__(self, db_path: Path, schema_path: Path, *, readonly: bool = False,
+                 query_log: Optional[QueryLog] = None):
         super().__init__()
         self.db_path = db_path
         self.schema_path = schema_path
+        self.readonly = readonly
+        self.query_log = query_log
+        self._pool = ConnectionPool.shared(db_path, schema_path)
         self._conn: Optional[Connection] = None
-        self._active = Semaphore(1)
+        self._pending = {}
+        self._cursors = WeakSet()
 
     def __enter__(self):
         return self.open()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._conn.close()
-        self._conn = None
-        self._active.release()
+        conn, self._conn = self._conn, None
+        self._pending.clear()
+        self._changed.clear()
+        for cursor in list(self._cursors):
+            cursor.close()
+        self._pool.release(conn, self.readonly)
         if self._dirty:
             self._dirty = False
             if exc_type is None:
                 raise ValueError('left repository in a dirty state. changes not committed.')
         return False
 
-    @classmethod
-    def _read_schema(cls, schema_path: Path):
-        with open(schema_path, 'br') as fp:
-            schema = fp.read()
-        return schema, hashlib.blake2b(schema).digest()
-
-    @classmethod
-    def _first_run(cls, conn: Connection, schema_path: Path):
-        schema, schema_hash = cls._read_schema(schema_path)
-        s = schema.decode('utf-8')
-        conn.executescript(s)
-        conn.commit()
-
     def open(self):
-        self._active.acquire()
-        retry = True
-        while self._conn is None and retry:
-            existed = self.db_path.exists()
-            self._conn = sqlite3.connect(self.db_path)
-            try:
-                if not existed:
-                    Repository._first_run(self._conn, self.schema_path)
-            except Exception as e:
-                logger.exception(e)
-                self._conn.close()
-                self._conn = None
-                raise
-            return self
-        raise RepositoryException("Could not open the repo.")
+        if self._conn is not None:
+            raise RepositoryException('repository is already open.')
+        self._conn = self._pool.acquire(self.readonly)
+        return self
+
+    def mark(self, *tables: str):
+        if self.readonly:
+            raise RepositoryException('cannot write. repository is read-only.')
+        super().mark(*tables)
 
     def cursor(self):
         if self._conn is None:
             raise RepositoryException('cannot get cursor. repository is closed.')
-        return self._conn.cursor()
+        if self.query_log is None:
+            cursor = self._conn.cursor()
+        else:
+            cursor = self._conn.cursor(InstrumentedCursor)
+            cursor.query_log = self.query_log
+        self._cursors.add(cursor)
+        return cursor
 
     def commit(self):
         self._conn.commit()
         self._dirty = False
+        for (table, _), row in self._pending.items():
+            self._pool.identities.put(table, row)
+        self._pending.clear()
+        changed, self._changed = self._changed, set()
+        if changed:
+            self._pool.committed(changed)
         return None
 
     def rollback(self):
         self._conn.rollback()
         self._dirty = False
+        self._pending.clear()
+        self._changed.clear()
         return None
 
+    def identity(self, table: str, key):
+        """The row of ``table`` with the given uuid or rowid.
+
+        Rows read while changes are pending stay private to this repository until they are committed.
+        """
+        try:
+            row_type = IdentityMap.row_types[table]
+        except KeyError:
+            raise UnknownTypeException(table) from None
+        row = self._pending.get((table, key)) or self._pool.identities.get(table, key)
+        if row is not None:
+            return row
+        c = self.cursor()
+        if isinstance(key, UUID):
+            c.execute(f'SELECT * FROM {table} WHERE uuid == ?', (key.bytes,))
+        else:
+            c.execute(f'SELECT * FROM {table} WHERE rowid == ?', (key,))
+        found = c.fetchone()
+        c.close()
+        if found is None:
+            raise NotFoundException(key)
+        row = row_type(found)
+        if self._dirty:
+            self._pending[(table, row.uuid)] = self._pending[(table, row.rowid)] = row
+        else:
+            self._pool.identities.put(table, row)
+        return row
+
     def game_dao(self):
         return GameDao(self)
 
@@ -466,5 +1024,8 @@ class Repository(AmongUsConnection):
     def room_dao(self):
         return RoomDao(self)
 
+    def stats_dao(self):
+        return StatsDao(self)
+
     def user_dao(self):
         return UserDao(self)
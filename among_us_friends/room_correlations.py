@@ -1,19 +1,156 @@
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Tuple
+
+from among_us_friends.lru_cache import LruCache
 from among_us_friends.repository import Repository
 
 
+class CoOccurrence:
+    """Sparse co-occurrence counters over the users of a room's matches, keyed by pairs of user rowids.
+
+    Results are folded in as they are appended. A match that gains results has its old contribution retracted and the
+    new one applied, so the work per update is proportional to the size of the changed matches.
+    """
+    def __init__(self):
+        self.last_rowid = 0
+        self.matches: Dict[int, Tuple[int, List[tuple]]] = {}
+        self.imposter_pairs = Counter()
+        self.teammates = Counter()
+        self.teammate_wins = Counter()
+        self.versus = Counter()
+        self.killed_by = Counter()
+        self.times_imposter = Counter()
+        self.expected_imposter = Counter()
+        self.lock = Lock()
+
+    def _add(self, players: int, results: List[tuple], sign: int):
+        imposters = [r for r in results if r[1]]
+        crew = [r for r in results if not r[1]]
+        chance = len(imposters) / players if players else 0.0
+        for user_id, imposter, _, _ in results:
+            self.times_imposter[user_id] += sign * imposter
+            self.expected_imposter[user_id] += sign * chance
+        for team in (imposters, crew):
+            for a, _, victory, _ in team:
+                for b, _, _, _ in team:
+                    if a != b:
+                        self.teammates[a, b] += sign
+                        self.teammate_wins[a, b] += sign * victory
+        for a, _, _, _ in imposters:
+            for b, _, _, _ in imposters:
+                if a != b:
+                    self.imposter_pairs[a, b] += sign
+        for victim, _, _, death in crew:
+            for imposter, _, _, _ in imposters:
+                self.versus[victim, imposter] += sign
+                self.killed_by[victim, imposter] += sign * death
+
+    def update(self, rows):
+        """Fold in (rowid, match_id, players, user_id, imposter, victory, death) rows newer than ``last_rowid``."""
+        changed = {}
+        for rowid, match_id, players, user_id, imposter, victory, death in rows:
+            changed.setdefault(match_id, (players, []))[1].append((user_id, imposter, victory, death))
+            self.last_rowid = max(self.last_rowid, rowid)
+        for match_id, (players, new_results) in changed.items():
+            _, results = self.matches.get(match_id, (players, []))
+            if results:
+                self._add(players, results, -1)
+            results = results + new_results
+            self._add(players, results, 1)
+            self.matches[match_id] = (players, results)
+
+
 class RoomCorrelations:
-    def __init__(self, room, matches):
+    """Correlations between the players of a room: how often two players are imposters together, the win rate with
+    each teammate, how often a crewmate dies in a match where a given player is imposter, and how often each player is
+    chosen as imposter against how often they would be by chance.
+
+    The counters of the most recently used rooms and modes are kept between requests and only read the results added
+    since. Only ``%`` and plain mode names are kept, other patterns are counted from scratch on every request.
+    """
+    _engines = LruCache(64)
+    _engines_lock = Lock()
+
+    def __init__(self, room, mode='%'):
         self._room = room
-        self._matches = matches
-        self._chosen_probability = None
+        self._mode = mode
+        self.imposter_pairs = []
+        self.teammates = []
+        self.killed_by = []
+        self.chosen_probability = []
+
+    @classmethod
+    def engine(cls, room, mode='%') -> CoOccurrence:
+        if mode != '%' and ('%' in mode or '_' in mode):
+            return CoOccurrence()
+        # LIKE ignores the case of ASCII letters, so 'Normal' and 'normal' select the same matches.
+        key = (room.uuid, mode.lower())
+        with cls._engines_lock:
+            engine = cls._engines.get(key)
+            if engine is None:
+                engine = CoOccurrence()
+                cls._engines.put(key, engine)
+            return engine
 
     def using(self, repo: Repository):
-        pass
+        engine = self.engine(self._room, self._mode)
+        with engine.lock:
+            engine.update(repo.result_dao().participation_for_room(self._room, self._mode, engine.last_rowid))
+            name = {}
+
+            def username(rowid):
+                if rowid not in name:
+                    name[rowid] = repo.user_dao().get_by_rowid(rowid).username
+                return name[rowid]
+
+            # Pairs are counted in both orders, keep one of each.
+            self.imposter_pairs = sorted(
+                ((username(a), username(b), count) for (a, b), count in engine.imposter_pairs.items()
+                 if a < b and count),
+                key=lambda k: k[2], reverse=True)
+            self.teammates = sorted(
+                ((username(a), username(b), games, engine.teammate_wins[a, b] / games)
+                 for (a, b), games in engine.teammates.items() if a < b and games),
+                key=lambda k: k[2], reverse=True)
+            self.killed_by = sorted(
+                ((username(a), username(b), engine.killed_by[a, b], games)
+                 for (a, b), games in engine.versus.items() if games),
+                key=lambda k: k[2], reverse=True)
+            self.chosen_probability = sorted(
+                ((username(user_id), times, engine.expected_imposter[user_id])
+                 for user_id, times in engine.times_imposter.items() if engine.expected_imposter[user_id]),
+                key=lambda k: k[1] / k[2], reverse=True)
+        return self
 
 
 class HtmlRoomCorrelationsFormatter:
-    def __init__(self, correlations: RoomCorrelations):
+    def __init__(self, correlations: RoomCorrelations, limit: int = 20):
         self.corr = correlations
+        self.limit = limit
 
     def format(self):
-        return 'Hello'
+        return ''.join(self.iter_format())
+
+    def iter_format(self):
+        corr = self.corr
+        yield '<h2>Imposters Together</h2><table><tr><th>Player</th><th>Player</th><th>#Matches</th></tr>'
+        for a, b, count in corr.imposter_pairs[:self.limit]:
+            yield f'<tr><td>{a}</td><td>{b}</td><td>{count}</td></tr>'
+        yield '</table>'
+        yield '<h2>Teammates</h2><table><tr><th>Player</th><th>Player</th><th>#Matches</th><th>Win Rate</th></tr>'
+        for a, b, games, rate in corr.teammates[:self.limit]:
+            yield f'<tr><td>{a}</td><td>{b}</td><td>{games}</td><td>{round(100 * rate)}%</td></tr>'
+        yield '</table>'
+        yield '<h2>Killed By</h2><table><tr><th>Crewmate</th><th>Imposter</th><th>#Deaths</th><th>#Matches</th>' \
+              '<th>Death Rate</th></tr>'
+        for a, b, deaths, games in corr.killed_by[:self.limit]:
+            yield f'<tr><td>{a}</td><td>{b}</td><td>{deaths}</td><td>{games}</td>' \
+                  f'<td>{round(100 * deaths / games)}%</td></tr>'
+        yield '</table>'
+        yield '<h2>Chosen As Imposter</h2><table><tr><th>Player</th><th>#Imposter</th><th>Expected</th>' \
+              '<th>Ratio</th></tr>'
+        for player, times, expected in corr.chosen_probability[:self.limit]:
+            yield f'<tr><td>{player}</td><td>{times}</td><td>{round(expected, 2)}</td>' \
+                  f'<td>{round(times / expected, 2)}</td></tr>'
+        yield '</table>'
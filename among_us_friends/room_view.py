@@ -0,0 +1,133 @@
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, Tuple
+
+from among_us_friends.lru_cache import LruCache
+from among_us_friends.repository import Repository
+from among_us_friends.room_correlations import RoomCorrelations
+from among_us_friends.columnar_stats import ColumnarMatchesStats
+from among_us_friends.stats import PlayersRoomStats, ColorsRoomStats, GroupedMatchesStats, group_keys
+
+# Engines for the grouped and windowed stats, by the name the STATS_ENGINE setting selects them with.
+stats_engines = {
+    'python': GroupedMatchesStats,
+    'columnar': ColumnarMatchesStats,
+}
+
+
+class RoomView:
+    """Everything the room page shows from the database, computed at one version of the room.
+
+    The sections are computed the first time they are read through a BoundRoomView, so a page can be sent while its
+    later sections are still being counted. The player and color stats are all-time unless ``since`` or ``last``
+    restrict them to the matches which ended at or after ``since`` or to the ``last`` matches. The grouped and
+    windowed stats are counted by ``engine``, one of ``stats_engines``.
+    """
+    sections = ('match_counts', 'player_stats', 'color_stats', 'grouped_stats', 'correlations')
+
+    def __init__(self, room, mode: str, groupings: Tuple[str, ...], version: int, updated_at: str, since: str = '',
+                 last: int = -1, engine=GroupedMatchesStats):
+        self.room = room
+        self.mode = mode
+        self.groupings = groupings
+        self.since = since
+        self.last = last
+        self.version = version
+        self.updated_at = datetime.fromisoformat(updated_at).replace(tzinfo=timezone.utc) if updated_at else None
+        self.engine = engine
+        self._sections = {}
+        self._lock = Lock()
+
+    def section(self, name: str, repo: Repository):
+        with self._lock:
+            try:
+                return self._sections[name]
+            except KeyError:
+                value = self._sections[name] = getattr(self, '_' + name)(repo)
+                return value
+
+    def bind(self, repo: Repository) -> 'BoundRoomView':
+        return BoundRoomView(self, repo)
+
+    def using(self, repo: Repository):
+        for name in self.sections:
+            self.section(name, repo)
+        return self
+
+    @property
+    def _windowed(self):
+        return bool(self.since) or self.last >= 0
+
+    def _match_counts(self, repo: Repository):
+        matches = {m.rowid: m for m in repo.match_dao().list_for_room(self.room, self.mode)}
+        counts = dict(repo.result_dao().counts_by_match_rowid_for_room(self.room))
+        return [(matches.get(k, None), counts.get(k, None)) for k in counts.keys() | matches.keys()]
+
+    def _player_stats(self, repo: Repository):
+        if self._windowed:
+            stats = self.engine(self.room, self.mode, {'player': group_keys['player']}, self.since, self.last)
+            return list(stats.using(repo)['player'].values())
+        return PlayersRoomStats(self.room, self.mode).using(repo)
+
+    def _color_stats(self, repo: Repository):
+        if self._windowed:
+            stats = self.engine(self.room, self.mode, {'color': group_keys['color']}, self.since, self.last)
+            return list(stats.using(repo)['color'].values())
+        return ColorsRoomStats(self.room, self.mode).using(repo)
+
+    def _grouped_stats(self, repo: Repository):
+        if not self.groupings:
+            return {}
+        keys = {name: group_keys[name] for name in self.groupings}
+        return {name: list(stats.values()) for name, stats in
+                self.engine(self.room, self.mode, keys, self.since, self.last).using(repo).items()}
+
+    def _correlations(self, repo: Repository):
+        return RoomCorrelations(self.room, self.mode).using(repo)
+
+
+class BoundRoomView:
+    """A RoomView whose sections are computed with ``repo`` when they are first read."""
+    def __init__(self, view: RoomView, repo: Repository):
+        self._view = view
+        self._repo = repo
+
+    def __getattr__(self, name):
+        if name in RoomView.sections:
+            return self._view.section(name, self._repo)
+        return getattr(self._view, name)
+
+
+class RoomViewCache:
+    """LRU cache of RoomViews keyed by their arguments and the room's version, so a change to the room makes its
+    cached views unreachable and they age out."""
+    def __init__(self, capacity: int = 256, engine=GroupedMatchesStats):
+        self._views = LruCache(capacity)
+        self.engine = engine
+
+    @property
+    def hits(self):
+        return self._views.hits
+
+    @property
+    def misses(self):
+        return self._views.misses
+
+    def __len__(self):
+        return len(self._views)
+
+    def get(self, repo: Repository, room, mode='%', groupings: Tuple[str, ...] = (), since: str = '',
+            last: int = -1) -> RoomView:
+        version, updated_at = repo.room_dao().version(room)
+        key = (room.uuid, mode, groupings, since, last, version)
+        view = self._views.get(key)
+        if view is None:
+            view = RoomView(room, mode, groupings, version, updated_at, since, last, self.engine)
+            self._views.put(key, view)
+        return view
+
+    def metrics(self) -> Dict[str, int]:
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses}
+
+
+room_views = RoomViewCache()
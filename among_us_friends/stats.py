@@ -1,6 +1,12 @@
+from collections import deque
+from itertools import groupby
+from operator import attrgetter
+from typing import Callable, Dict, List
+
 from among_us_friends.imposter_stat import ImposterStat
 from among_us_friends.keyed_default_dict import KeyedDefaultDict
-from among_us_friends.repository import Repository, User
+from among_us_friends.repository import Repository, User, SqliteMatchResult
+from among_us_friends.stats_table import StatsTable
 
 
 class PlayersMatchesStats:
@@ -31,4 +37,112 @@ class ColorsMatchesStats:
             match_num_imposters = sum(1 for x in match_results if x.imposter)
             for result in match_results:
                 colors[result.color].tablulate(match, match_num_imposters, result)
-        return colors.values()
\ No newline at end of file
+        return colors.values()
+
+
+class RoomStats:
+    """Calculates the same aggregate stats as PlayersMatchesStats or ColorsMatchesStats for all matches of a room.
+
+    By default the stats are read from the counters StatsDao maintains. With ``live`` they are counted from the
+    results by a single query instead.
+    """
+    group_by: str
+
+    def __init__(self, room, mode='%', live=False):
+        self.room = room
+        self.mode = mode
+        self.live = live
+
+    def using(self, repo: Repository):
+        dao = repo.result_dao() if self.live else repo.stats_dao()
+        return [ImposterStat.from_counts(*row[1:])
+                for row in dao.imposter_stats_for_room(self.room, self.mode, self.group_by)]
+
+
+class PlayersRoomStats(RoomStats):
+    group_by = 'user'
+
+
+class ColorsRoomStats(RoomStats):
+    group_by = 'color'
+
+
+# Group keys for GroupedMatchesStats, each extracting the title of a result's group from a SqliteMatchResult.
+group_keys: Dict[str, Callable[[SqliteMatchResult], str]] = {
+    'player': attrgetter('username'),
+    'color': attrgetter('color'),
+    'map': attrgetter('map'),
+    'network': attrgetter('network'),
+    'platform': attrgetter('platform'),
+    'host': attrgetter('host'),
+    'mode': attrgetter('mode'),
+}
+
+
+class GroupedMatchesStats:
+    """Calculates aggregate stats for several groupings of a room's results, all filled in one scan of the results.
+
+    ``keys`` maps the name of each grouping to the extractor of its group title, by default all of ``group_keys``.
+    With ``since`` only matches which ended at or after it are counted, with ``last`` only that many of the latest.
+    """
+    def __init__(self, room, mode='%', keys: Dict[str, Callable[[SqliteMatchResult], str]] = None, since: str = '',
+                 last: int = -1):
+        self.room = room
+        self.mode = mode
+        self.keys = keys if keys is not None else group_keys
+        self.since = since
+        self.last = last
+
+    def using(self, repo: Repository) -> Dict[str, StatsTable]:
+        groups = {name: StatsTable() for name in self.keys}
+        extractors = [(groups[name], extract) for name, extract in self.keys.items()]
+        for result in repo.result_dao().list_with_matches_for_room(self.room, self.mode, self.since, self.last):
+            for stats, extract in extractors:
+                stats.tablulate(extract(result), result, result.imposters, result)
+        return groups
+
+
+class SlidingWindowStats:
+    """ImposterStats per group over the latest ``size`` matches added, retiring the oldest match as a new one comes in.
+    """
+    def __init__(self, key: Callable[[SqliteMatchResult], str], size: int):
+        self.key = key
+        self.size = size
+        self.groups = StatsTable()
+        self._window = deque()
+
+    def add(self, match_results: List[SqliteMatchResult]):
+        for result in match_results:
+            self.groups.tablulate(self.key(result), result, result.imposters, result)
+        self._window.append(match_results)
+        if len(self._window) > self.size:
+            for result in self._window.popleft():
+                self.groups.untablulate(self.key(result), result, result.imposters, result)
+
+
+class TrendStats:
+    """A series per group of a room, with a point after each of the group's matches holding its stats over the last
+    ``window`` matches of the room."""
+    def __init__(self, room, mode='%', key: Callable[[SqliteMatchResult], str] = group_keys['player'],
+                 window: int = 20, since: str = ''):
+        self.room = room
+        self.mode = mode
+        self.key = key
+        self.window = window
+        self.since = since
+
+    def using(self, repo: Repository) -> Dict[str, List[tuple]]:
+        """Map of group title to (end_at, ImposterStat counters) points, see ImposterStat.from_counts."""
+        sliding = SlidingWindowStats(self.key, self.window)
+        series = {}
+        results = repo.result_dao().list_with_matches_for_room(self.room, self.mode, self.since)
+        for _, match_results in groupby(results, key=attrgetter('match_id')):
+            match_results = list(match_results)
+            sliding.add(match_results)
+            for title in {self.key(result) for result in match_results}:
+                stat = sliding.groups[title]
+                series.setdefault(title, []).append((
+                    match_results[0].end_at, stat.total_matches, stat.times_imposter, stat.deviation,
+                    stat.wins_crew, stat.wins_imposter, stat.loss_crew, stat.loss_imposter,
+                    stat.imposter_counts[1], stat.imposter_counts[2], stat.imposter_counts[3]))
+        return series
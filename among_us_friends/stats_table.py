@@ -0,0 +1,102 @@
+from array import array
+from typing import Dict, Hashable, Iterator
+
+from among_us_friends.imposter_stat import ImposterStatProperties
+
+
+class StatsTableRow(ImposterStatProperties):
+    """A view of one row of a StatsTable with the attributes and properties of an ImposterStat."""
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'StatsTable', index: int):
+        self._table = table
+        self._index = index
+
+    title = property(lambda self: self._table.titles[self._index])
+    total_matches = property(lambda self: self._table.total_matches[self._index])
+    times_imposter = property(lambda self: self._table.times_imposter[self._index])
+    deviation = property(lambda self: self._table.deviation[self._index])
+    wins_crew = property(lambda self: self._table.wins_crew[self._index])
+    wins_imposter = property(lambda self: self._table.wins_imposter[self._index])
+    loss_crew = property(lambda self: self._table.loss_crew[self._index])
+    loss_imposter = property(lambda self: self._table.loss_imposter[self._index])
+
+    @property
+    def imposter_counts(self) -> Dict[int, int]:
+        return {n: column[self._index] for n, column in enumerate(self._table.imposter_counts, start=1)}
+
+
+class StatsTable:
+    """The counters of an ImposterStat for many groups, kept in one array per counter indexed by a dense group id
+    instead of an object per group.
+
+    Indexing the table by a group key returns a StatsTableRow, adding the group if it is new.
+    """
+    def __init__(self):
+        self.ids: Dict[Hashable, int] = {}
+        self.titles = []
+        self.total_matches = array('q')
+        self.times_imposter = array('q')
+        self.deviation = array('d')
+        self.wins_crew = array('q')
+        self.wins_imposter = array('q')
+        self.loss_crew = array('q')
+        self.loss_imposter = array('q')
+        self.imposter_counts = (array('q'), array('q'), array('q'))
+        self._columns = (self.total_matches, self.times_imposter, self.deviation, self.wins_crew, self.wins_imposter,
+                         self.loss_crew, self.loss_imposter) + self.imposter_counts
+
+    @classmethod
+    def from_columns(cls, titles, total_matches, times_imposter, deviation, wins_crew, wins_imposter, loss_crew,
+                     loss_imposter, one_imposter, two_imposters, three_imposters) -> 'StatsTable':
+        """A table of the groups ``titles`` with the counters in the same order as ImposterStat.from_counts, one
+        sequence per counter."""
+        table = cls()
+        table.titles = list(titles)
+        table.ids = {title: index for index, title in enumerate(table.titles)}
+        for column, values in zip(table._columns, (total_matches, times_imposter, deviation, wins_crew,
+                                                   wins_imposter, loss_crew, loss_imposter, one_imposter,
+                                                   two_imposters, three_imposters)):
+            column.extend(values)
+        return table
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, key) -> StatsTableRow:
+        return StatsTableRow(self, self.id(key))
+
+    def id(self, key) -> int:
+        try:
+            return self.ids[key]
+        except KeyError:
+            index = self.ids[key] = len(self.titles)
+            self.titles.append(key)
+            for column in self._columns:
+                column.append(0)
+            return index
+
+    def values(self) -> Iterator[StatsTableRow]:
+        return (StatsTableRow(self, index) for index in range(len(self.titles)))
+
+    def tablulate(self, key, match, match_num_imposters, result, sign=1):
+        """Count a result for the group ``key`` like ImposterStat.tablulate, or undo that with a ``sign`` of -1."""
+        index = self.id(key)
+        self.total_matches[index] += sign
+        if result.imposter:
+            self.times_imposter[index] += sign
+            self.deviation[index] += sign / match_num_imposters
+            if result.victory:
+                self.wins_imposter[index] += sign
+            else:
+                self.loss_imposter[index] += sign
+            self.imposter_counts[match_num_imposters - 1][index] += sign
+        else:
+            self.deviation[index] -= sign / (match.players - match_num_imposters)
+            if result.victory:
+                self.wins_crew[index] += sign
+            else:
+                self.loss_crew[index] += sign
+
+    def untablulate(self, key, match, match_num_imposters, result):
+        self.tablulate(key, match, match_num_imposters, result, -1)
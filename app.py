@@ -1,18 +1,23 @@
 import logging
+from itertools import islice
 from pathlib import Path
 from uuid import UUID, uuid4
 
-from flask import Flask, render_template, request, json, url_for
+from flask import Flask, render_template, request, json, url_for, Response, stream_with_context, g
 from flask_login import LoginManager, login_required, current_user, logout_user, login_user
 from werkzeug.utils import redirect
 
 from among_us_friends.blueprints import open_repository
 from among_us_friends.blueprints.api import api
 from among_us_friends.blueprints.games import games
+from among_us_friends.blueprints.leaderboards import leaderboards
 from among_us_friends.blueprints.lobbies import lobbies
 from among_us_friends.blueprints.rooms import rooms
 from among_us_friends.blueprints.users import users
-from among_us_friends.repository import SqliteUser, NotFoundException
+from among_us_friends.instrumentation import QueryLog, DependencyTimings
+from among_us_friends.lru_cache import LruCache
+from among_us_friends.repository import SqliteUser, NotFoundException, ConnectionPool
+from among_us_friends.room_view import room_views, stats_engines
 
 DB_PATH = Path('server/db.sqlite')
 SCHEMA_PATH = Path("server/schema.sql")
@@ -30,6 +35,8 @@ if not CONFIG_PATH.exists():
 app = Flask('among-us-friends')
 app.config.from_pyfile(CONFIG_PATH)
 
+room_views.engine = stats_engines[app.config.get('STATS_ENGINE', 'python')]
+
 login = LoginManager(app)
 login.login_view = '/login'
 
@@ -58,14 +65,25 @@ class UserWrap:
         return self._user.username
 
 
+# Users of recent sessions, so loading the user of a request does not need a connection.
+user_cache = LruCache(app.config.get('USER_CACHE_SIZE', 1024), ttl=app.config.get('USER_CACHE_TTL', 300))
+ConnectionPool.on_commit(lambda tables: user_cache.clear() if 'users' in tables else None)
+
+
 @login.user_loader
 def load_user(uuid: str):
     uuid = UUID(uuid)
-    with open_repository() as repo:
+    user = user_cache.get(uuid)
+    g.user_cache = 'miss' if user is None else 'hit'
+    if user is not None:
+        return user
+    with open_repository(readonly=True) as repo:
         try:
-            return UserWrap(repo.user_dao().require_uuid(uuid))
+            user = UserWrap(repo.user_dao().require_uuid(uuid))
         except NotFoundException:
             return None
+    user_cache.put(uuid, user)
+    return user
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -77,21 +95,76 @@ app.register_blueprint(users)
 app.register_blueprint(lobbies)
 app.register_blueprint(rooms)
 app.register_blueprint(games)
+app.register_blueprint(leaderboards)
+
+
+@app.before_request
+def start_query_log():
+    g.query_log = QueryLog(slow_query_ms=app.config.get('SLOW_QUERY_MS', 100))
+    g.dependency_timings = DependencyTimings()
+
+
+@app.after_request
+def add_server_timing(response):
+    query_log = g.get('query_log')
+    dependency_timings = g.get('dependency_timings')
+    if response.is_streamed:
+        # The body runs its statements after the headers are sent, so the totals are logged once it is done.
+        request_line = f'{request.method} {request.full_path}'
+        response.call_on_close(lambda: log_timings(request_line, query_log, dependency_timings))
+    else:
+        if query_log is not None:
+            response.headers.add('Server-Timing', query_log.server_timing())
+        if dependency_timings is not None and dependency_timings.records:
+            response.headers.add('Server-Timing', dependency_timings.server_timing())
+    if 'user_cache' in g:
+        response.headers.add('Server-Timing', f'user-cache;desc="{g.user_cache}"')
+    return response
+
+
+def log_timings(request_line: str, query_log: QueryLog, dependency_timings: DependencyTimings):
+    timings = [query_log.server_timing()] if query_log is not None else []
+    if dependency_timings is not None and dependency_timings.records:
+        timings.append(dependency_timings.server_timing())
+    logger.info(f'{request_line} streamed: {", ".join(timings)}')
+
+
+@app.context_processor
+def inject_query_log():
+    return {'query_log': g.get('query_log') if app.config.get('SQL_DEBUG_FOOTER', False) else None}
+
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats():
+    """Recompute the maintained room stats from the results."""
+    with open_repository() as repo:
+        repo.stats_dao().rebuild()
+        repo.commit()
 
 
 @app.route('/')
 def index():
-    with open_repository() as repo:
-        lobbies = repo.lobby_dao().list()
+    with open_repository(readonly=True) as repo:
+        lobbies = list(repo.lobby_dao().list())
     return render_template("index.html", lobbies=lobbies)
 
 
 @app.route("/admin/users")
 @login_required
 def admin_users():
-    with open_repository() as repo:
-        users = repo.user_dao().list()
-    return json.dumps(users)
+    def generate():
+        with open_repository(readonly=True) as repo:
+            yield '['
+            for index, user in enumerate(repo.user_dao().list()):
+                yield (',' if index else '') + json.dumps({'uuid': user.uuid.hex, 'username': user.username})
+            yield ']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+@app.route("/admin/metrics")
+@login_required
+def admin_metrics():
+    return json.jsonify({'room_views': room_views.metrics(), 'users': user_cache.metrics()})
 
 
 @app.route("/login", methods=['GET', 'POST'])
@@ -102,7 +175,7 @@ def login():
         return render_template('login.html')
     try:
         form = request.form
-        with open_repository() as repo:
+        with open_repository(readonly=True) as repo:
             user = repo.user_dao().require_username(form['username'])
         user = UserWrap(user)
         login_user(user, form.get('remember', False))
@@ -121,8 +194,13 @@ def logout():
 
 @app.route("/dump")
 def dump():
-    with open_repository() as repo:
-        return '<pre>' + '\n'.join(repo._conn.iterdump())
+    def generate():
+        with open_repository(readonly=True) as repo:
+            lines = repo._conn.iterdump()
+            yield '<pre>' + next(lines, '')
+            for chunk in iter(lambda: list(islice(lines, 256)), []):
+                yield '\n' + '\n'.join(chunk)
+    return Response(stream_with_context(generate()), mimetype='text/html')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,52 @@
+"""Requests per second of the room page at 1, 4 and 16 concurrent clients.
+
+Run from the repository root after loading the database with loader.py:
+
+    python -m otherdata.bench_rooms [seconds per level]
+"""
+import sys
+import threading
+from time import perf_counter
+
+from app import app
+from among_us_friends.blueprints import open_repository
+
+CLIENTS = (1, 4, 16)
+
+
+def client(room_path, user_id, deadline, counts, index):
+    c = app.test_client()
+    with c.session_transaction() as session:
+        session['_user_id'] = user_id
+        session['_fresh'] = True
+    while perf_counter() < deadline:
+        response = c.get(room_path)
+        response.get_data()
+        if response.status_code != 200:
+            raise ValueError(f'{room_path} answered {response.status_code}')
+        counts[index] += 1
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    with app.app_context():
+        with open_repository(readonly=True) as repo:
+            room = next(iter(repo.room_dao().list()))
+            user = next(iter(repo.user_dao().list()))
+    room_path = f'/rooms/{room.uuid.hex}'
+    for clients in CLIENTS:
+        counts = [0] * clients
+        deadline = perf_counter() + seconds
+        threads = [threading.Thread(target=client, args=(room_path, user.uuid.hex, deadline, counts, index))
+                   for index in range(clients)]
+        start = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - start
+        print(f'{clients:>2} clients: {sum(counts) / elapsed:8.1f} requests/s ({sum(counts)} in {elapsed:.1f}s)')
+
+
+if __name__ == '__main__':
+    main()
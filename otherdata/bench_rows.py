@@ -0,0 +1,58 @@
+"""Memory per row and field access time of the row classes built by sqlite_row.
+
+Compares the lazily decoding slotted rows with the tuple-backed read-only rows for the fields of SqliteResult and
+SqliteMatch. Run from the repository root:
+
+    python -m otherdata.bench_rows [rows]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+from uuid import uuid4
+
+from among_us_friends.repository import sqlite_row
+
+RESULT_FIELDS = ('rowid:int matchid:int user_id:int uuid:uuid r_time:str platform:str color:str imposter:bool '
+                 'victory:bool death:bool comments:str')
+MATCH_FIELDS = ('rowid:int room_id:int owner:int host:int uuid:uuid title:str end_at:str players:int mode:str map:str '
+                'result:str network:str')
+
+
+def result_row(i):
+    return (i, i // 8, i % 12, uuid4().bytes, '2020-09-25T21:12:42', 'windows pc', 'red', i % 5 == 0, i % 2,
+            i % 3 == 0, '')
+
+
+def match_row(i):
+    return (i, 1, 1, 2, uuid4().bytes, str(i), '2020-09-25T21:12:42', 10, 'normal', 'skeld', 'normal', 'online')
+
+
+def measure(name, row_type, fields, make_row, n):
+    fields = [field.split(':')[0] for field in fields.split(' ')]
+    tracemalloc.start()
+    rows = [row_type(make_row(i)) for i in range(n)]
+    for row in rows:
+        for field in fields:
+            getattr(row, field)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    getters = [getattr(row_type, field).fget for field in fields]
+    start = perf_counter()
+    for row in rows:
+        for getter in getters:
+            getter(row)
+    elapsed = perf_counter() - start
+    print(f'{name:<24} {size / n:7.0f} bytes/row {elapsed / (n * len(fields)) * 1e9:6.1f} ns/field read')
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name, fields, make_row in (('SqliteResult', RESULT_FIELDS, result_row),
+                                   ('SqliteMatch', MATCH_FIELDS, match_row)):
+        for readonly in (False, True):
+            row_type = sqlite_row(name, fields, readonly=readonly)
+            measure(f'{name} ({"read-only" if readonly else "lazy"})', row_type, fields, make_row, n)
+
+
+if __name__ == '__main__':
+    main()
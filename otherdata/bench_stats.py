@@ -0,0 +1,87 @@
+"""Time of the room stats engines on synthetic rooms of 10k, 100k and 1M results.
+
+Compares the numpy ColumnarMatchesStats with the pure-Python GroupedMatchesStats of stats.py over every grouping, and
+for players and colors the per-match PlayersMatchesStats, the SQL aggregation and the maintained stats tables. The
+per-match engine is skipped above 100k results. Run from the repository root:
+
+    python -m otherdata.bench_stats [results ...]
+"""
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+from among_us_friends import columnar_stats
+from among_us_friends.columnar_stats import ColumnarMatchesStats
+from among_us_friends.repository import Repository
+from among_us_friends.stats import GroupedMatchesStats, PlayersMatchesStats, PlayersRoomStats, ColorsRoomStats
+
+SCHEMA_PATH = Path('server/schema.sql')
+SIZES = (10_000, 100_000, 1_000_000)
+COLORS = ('red', 'blue', 'green', 'pink', 'orange', 'yellow', 'black', 'white', 'purple', 'brown', 'cyan', 'lime')
+
+
+def populate(db_path: Path, results: int):
+    rng = random.Random(results)
+    start = datetime(2020, 9, 25, 21)
+    with Repository(db_path, SCHEMA_PATH) as repo:
+        users = [repo.user_dao().create(f'player{n}', None) for n in range(40)]
+        room = repo.room_dao().create(repo.lobby_dao().create('Friends', True), 'main')
+        repo.commit()
+        added = 0
+        while added < results:
+            matches = []
+            for index in range(1000):
+                players = rng.randint(4, 10)
+                matches.append(SimpleNamespace(
+                    room=room, owner=users[0], host=rng.choice(users), title=str(added + index),
+                    end_at=(start + timedelta(minutes=added + index)).isoformat(), players=players,
+                    mode=rng.choice(('normal', 'hide')), map=rng.choice(('skeld', 'mira', 'polus')),
+                    result='normal', network=rng.choice(('online', 'local'))))
+            rows = []
+            for match, rowid in zip(matches, repo.match_dao().create_many(matches)):
+                imposters = rng.randint(1, min(3, match.players - 3))
+                imposters_won = rng.random() < 0.4
+                for seat, (user, color) in enumerate(zip(rng.sample(users, match.players),
+                                                         rng.sample(COLORS, match.players))):
+                    rows.append(SimpleNamespace(
+                        match_rowid=rowid, user=user, timestamp=match.end_at, platform='windows pc', color=color,
+                        imposter=seat < imposters, victory=(seat < imposters) == imposters_won, death=False,
+                        comments=''))
+            repo.result_dao().create_many(rows)
+            repo.commit()
+            added += len(rows)
+    return room
+
+
+def timed(name, fn):
+    start = perf_counter()
+    fn()
+    print(f'  {name:<40} {(perf_counter() - start) * 1000:10.1f}ms')
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = Path(directory) / 'db.sqlite'
+            room = populate(db_path, size)
+            print(f'{size} results')
+            with Repository(db_path, SCHEMA_PATH, readonly=True) as repo:
+                if columnar_stats.numpy is not None:
+                    timed('numpy ColumnarMatchesStats, all groups', lambda: ColumnarMatchesStats(room).using(repo))
+                timed('python GroupedMatchesStats, all groups', lambda: GroupedMatchesStats(room).using(repo))
+                if size <= 100_000:
+                    timed('python PlayersMatchesStats', lambda: PlayersMatchesStats(
+                        list(repo.match_dao().list_for_room(room))).using(repo))
+                timed('SQL players and colors', lambda: (PlayersRoomStats(room, live=True).using(repo),
+                                                         ColorsRoomStats(room, live=True).using(repo)))
+                timed('maintained players and colors', lambda: (PlayersRoomStats(room).using(repo),
+                                                                ColorsRoomStats(room).using(repo)))
+
+
+if __name__ == '__main__':
+    main()
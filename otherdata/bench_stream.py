@@ -0,0 +1,69 @@
+"""Time to first byte, total time and peak memory of the streamed room page on synthetic rooms of 10k and 100k results.
+
+The first request of each room computes its view, the later ones read it from the room view cache. The peak memory is
+measured on a cached view, so it is what streaming the page costs. Run from the repository root:
+
+    python -m otherdata.bench_stream [results ...]
+"""
+import logging
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+from app import app
+from among_us_friends.repository import Repository
+from otherdata.bench_stats import SCHEMA_PATH, populate
+
+SIZES = (10_000, 100_000)
+
+# The app logs every statement, keep the report readable.
+logging.getLogger().setLevel(logging.ERROR)
+
+
+def measure(c, path, traced=False):
+    """The time to the first chunk and to the last of one request, and with ``traced`` the peak of memory allocated
+    while it streams. Tracing slows the request down, so its times are not comparable."""
+    if traced:
+        tracemalloc.start()
+    start = perf_counter()
+    response = c.get(path)
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    first_byte = perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    total = perf_counter() - start
+    response.close()
+    peak = 0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return first_byte, total, peak, size
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = Path(directory) / 'db.sqlite'
+            room = populate(db_path, size)
+            with Repository(db_path, SCHEMA_PATH, readonly=True) as repo:
+                user = next(iter(repo.user_dao().list()))
+            app.config.update(DB_PATH=str(db_path), SCHEMA_PATH=str(SCHEMA_PATH), GAME_SERVICE_TIMEOUT=0.1)
+            c = app.test_client()
+            with c.session_transaction() as session:
+                session['_user_id'] = user.uuid.hex
+                session['_fresh'] = True
+            print(f'{size} results')
+            path = f'/rooms/{room.uuid.hex}'
+            for name in ('cold', 'warm'):
+                first_byte, total, _, length = measure(c, path)
+                print(f'  {name}: first byte {first_byte * 1000:8.1f}ms, complete {total * 1000:8.1f}ms, '
+                      f'{length / 2 ** 10:.0f}KiB')
+            print(f'  warm: peak {measure(c, path, traced=True)[2] / 2 ** 10:8.0f}KiB allocated while streaming')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""File size and point lookup time of uuids stored as 32 character hex TEXT against 16 byte BLOBs.
+
+Fills the matches table of schema.sql, with the indexes of migration 0002, with the same synthetic matches in both
+encodings and looks up a random sample of them by uuid through the matches_uuid index. Run from the repository root:
+
+    python -m otherdata.bench_uuids [matches]
+"""
+import random
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from uuid import UUID
+
+SCHEMA_PATH = Path('server/schema.sql')
+INDEXES_PATH = Path('server/migrations/0002_indexes.sql')
+LOOKUPS = 20_000
+
+
+def populate(db_path: Path, uuids, encode):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_PATH.read_text())
+    conn.executescript(INDEXES_PATH.read_text())
+    with conn:
+        conn.executemany('INSERT INTO matches (room_id, owner, host, uuid, title, end_at, players, mode, map, result,'
+                         ' network) VALUES (1, 1, 1, ?, ?, ?, 10, ?, ?, ?, ?)',
+                         ((encode(uuid), str(n), f'2020-09-25T21:{n % 60:02}:00', 'normal', 'skeld', 'normal',
+                           'online') for n, uuid in enumerate(uuids)))
+    conn.execute('VACUUM')
+    return conn
+
+
+def lookup_time(conn, keys):
+    start = perf_counter()
+    for key in keys:
+        conn.execute('SELECT * FROM matches WHERE uuid == ?', (key,)).fetchone()
+    return (perf_counter() - start) / len(keys)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(n)
+    uuids = [UUID(int=rng.getrandbits(128), version=4) for _ in range(n)]
+    sample = rng.sample(uuids, min(LOOKUPS, n))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, encode in (('hex TEXT', lambda uuid: uuid.hex), ('16-byte BLOB', lambda uuid: uuid.bytes)):
+            db_path = Path(directory) / f'{name.split()[-1].lower()}.sqlite'
+            conn = populate(db_path, uuids, encode)
+            keys = [encode(uuid) for uuid in sample]
+            lookup_time(conn, keys[:1000])
+            elapsed = lookup_time(conn, keys)
+            conn.close()
+            print(f'{name:<14} {db_path.stat().st_size / 2 ** 20:7.1f}MiB {elapsed * 1e6:6.1f}us per lookup')
+
+
+if __name__ == '__main__':
+    main()
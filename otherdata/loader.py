@@ -2,9 +2,8 @@ import csv
 import json
 from datetime import datetime
 from pathlib import Path
-from sqlite3 import IntegrityError
 
-from among_us_friends.repository import Repository
+from among_us_friends.repository import Repository, BatchInsertException
 
 DB_PATH = Path('../server/db.sqlite')
 SCHEMA_PATH = Path('../server/schema.sql')
@@ -33,6 +32,9 @@ def de_fuzz_usernames():
             if f in fuzz_police:
                 raise ValueError(f'Non unique fuzzy name {f!r} assigned to {fuzz_police[f]!r} and {unique!r}.')
             fuzz_police[f] = unique
+    # Exports from /rooms/<id>/export name users by their unique name.
+    for unique in j:
+        fuzz_police.setdefault(unique, unique)
 
 
 def get_by_fuzzy_username(fuzzy):
@@ -88,11 +90,10 @@ def collect():
         matches = iter(list((csv.reader(fp))))
     next(matches)  # Skip header
     matches = [CsvRowMatch(m, room) for m in matches]
-    match_title_row = {}
     with Repository(DB_PATH, SCHEMA_PATH) as repo:
-        for match in matches:
-            match_title_row[match.title] = repo.match_dao().create(match)
+        match_rowids = repo.match_dao().create_many(matches)
         repo.commit()
+    match_title_row = dict(zip((match.title for match in matches), match_rowids))
 
     # Results
     with open(RESULT_FILE) as fp:
@@ -101,10 +102,11 @@ def collect():
     results = [CsvRowResult(r, match_title_row) for r in results]
     with Repository(DB_PATH, SCHEMA_PATH) as repo:
         try:
-            for result in results:
-                repo.result_dao().create(result)
-        except IntegrityError as e:
-            raise ValueError('Problem with result ' + str(result.match_rowid) + ' on ' + str(result.user.username)) from e
+            repo.result_dao().create_many(results)
+        except BatchInsertException as e:
+            index, error = e.errors[0]
+            result = results[index]
+            raise ValueError('Problem with result ' + str(result.match_rowid) + ' on ' + str(result.user.username)) from error
         repo.commit()
 
         print('\n'.join(repo._conn.iterdump()))
@@ -0,0 +1,16 @@
+-- Secondary indexes for the lookups made by the DAOs in repository.py.
+
+-- GameDao.list_for_room
+CREATE INDEX IF NOT EXISTS games_room_id ON games (room_id);
+
+-- RoomDao.list_for_lobby
+CREATE INDEX IF NOT EXISTS rooms_lobby_id ON rooms (lobby_id);
+
+-- MatchDao.list_for_room, ResultDao.counts_by_match_rowid_for_room
+CREATE INDEX IF NOT EXISTS matches_room_id_mode ON matches (room_id, mode);
+
+-- ResultDao.list_for_match
+CREATE INDEX IF NOT EXISTS matches_uuid ON matches (uuid);
+
+-- MatchDao.list_for_room, MatchDao.imposters_for_match
+CREATE INDEX IF NOT EXISTS results_match_id_imposter ON results (match_id, imposter, user_id);
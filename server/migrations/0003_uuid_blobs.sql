@@ -0,0 +1,9 @@
+-- Store uuids as their 16 raw bytes instead of 32 hex characters. The columns keep their TEXT declaration,
+-- TEXT affinity stores BLOB values unchanged. Run VACUUM afterwards to return the freed pages to the filesystem.
+
+UPDATE users SET uuid = unhex(uuid) WHERE typeof(uuid) == 'text';
+UPDATE lobbies SET uuid = unhex(uuid) WHERE typeof(uuid) == 'text';
+UPDATE rooms SET uuid = unhex(uuid) WHERE typeof(uuid) == 'text';
+UPDATE games SET uuid = unhex(uuid) WHERE typeof(uuid) == 'text';
+UPDATE matches SET uuid = unhex(uuid) WHERE typeof(uuid) == 'text';
+UPDATE results SET uuid = unhex(uuid) WHERE typeof(uuid) == 'text';
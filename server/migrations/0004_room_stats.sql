@@ -0,0 +1,64 @@
+-- ImposterStat counters per room, mode and player or color, maintained by StatsDao whenever results are added.
+
+CREATE TABLE room_user_stats (
+    room_id         INTEGER NOT NULL,
+    mode            TEXT NOT NULL,
+    user_id         INTEGER NOT NULL,
+    total_matches   INTEGER NOT NULL,
+    times_imposter  INTEGER NOT NULL,
+    deviation       REAL NOT NULL,
+    wins_crew       INTEGER NOT NULL,
+    wins_imposter   INTEGER NOT NULL,
+    loss_crew       INTEGER NOT NULL,
+    loss_imposter   INTEGER NOT NULL,
+    one_imposter    INTEGER NOT NULL,
+    two_imposters   INTEGER NOT NULL,
+    three_imposters INTEGER NOT NULL,
+
+    PRIMARY KEY (room_id, mode, user_id)
+);
+
+CREATE TABLE room_color_stats (
+    room_id         INTEGER NOT NULL,
+    mode            TEXT NOT NULL,
+    color           TEXT NOT NULL,
+    total_matches   INTEGER NOT NULL,
+    times_imposter  INTEGER NOT NULL,
+    deviation       REAL NOT NULL,
+    wins_crew       INTEGER NOT NULL,
+    wins_imposter   INTEGER NOT NULL,
+    loss_crew       INTEGER NOT NULL,
+    loss_imposter   INTEGER NOT NULL,
+    one_imposter    INTEGER NOT NULL,
+    two_imposters   INTEGER NOT NULL,
+    three_imposters INTEGER NOT NULL,
+
+    PRIMARY KEY (room_id, mode, color)
+);
+
+CREATE TEMP VIEW match_imposters AS
+    SELECT m.rowid AS match_id, m.room_id, m.mode, m.players, SUM(r.imposter) AS imposters
+    FROM matches AS m JOIN results AS r ON r.match_id == m.rowid
+    GROUP BY m.rowid;
+
+INSERT INTO room_user_stats
+    SELECT mi.room_id, mi.mode, r.user_id, COUNT(*), SUM(r.imposter),
+        TOTAL(CASE WHEN r.imposter THEN 1.0 / mi.imposters ELSE -1.0 / (mi.players - mi.imposters) END),
+        SUM(NOT r.imposter AND r.victory), SUM(r.imposter AND r.victory),
+        SUM(NOT r.imposter AND NOT r.victory), SUM(r.imposter AND NOT r.victory),
+        SUM(r.imposter AND mi.imposters == 1), SUM(r.imposter AND mi.imposters == 2),
+        SUM(r.imposter AND mi.imposters == 3)
+    FROM results AS r JOIN match_imposters AS mi ON mi.match_id == r.match_id
+    GROUP BY mi.room_id, mi.mode, r.user_id;
+
+INSERT INTO room_color_stats
+    SELECT mi.room_id, mi.mode, r.color, COUNT(*), SUM(r.imposter),
+        TOTAL(CASE WHEN r.imposter THEN 1.0 / mi.imposters ELSE -1.0 / (mi.players - mi.imposters) END),
+        SUM(NOT r.imposter AND r.victory), SUM(r.imposter AND r.victory),
+        SUM(NOT r.imposter AND NOT r.victory), SUM(r.imposter AND NOT r.victory),
+        SUM(r.imposter AND mi.imposters == 1), SUM(r.imposter AND mi.imposters == 2),
+        SUM(r.imposter AND mi.imposters == 3)
+    FROM results AS r JOIN match_imposters AS mi ON mi.match_id == r.match_id
+    GROUP BY mi.room_id, mi.mode, r.color;
+
+DROP VIEW match_imposters;
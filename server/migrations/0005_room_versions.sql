@@ -0,0 +1,68 @@
+-- A version per room, bumped by triggers whenever the room, its matches or their results change. Cached room views
+-- are keyed by it and it is the room page's ETag.
+
+CREATE TABLE room_versions (
+    room_id    INTEGER PRIMARY KEY,
+    version    INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+INSERT INTO room_versions (room_id, version, updated_at)
+    SELECT rowid, 1, strftime('%Y-%m-%d %H:%M:%S', 'now') FROM rooms;
+
+CREATE TRIGGER room_versions_rooms_insert AFTER INSERT ON rooms
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        VALUES (NEW.rowid, 1, strftime('%Y-%m-%d %H:%M:%S', 'now'));
+END;
+
+CREATE TRIGGER room_versions_rooms_update AFTER UPDATE ON rooms
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        VALUES (NEW.rowid, 1, strftime('%Y-%m-%d %H:%M:%S', 'now'))
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER room_versions_matches_insert AFTER INSERT ON matches
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        VALUES (NEW.room_id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now'))
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER room_versions_matches_update AFTER UPDATE ON matches
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        SELECT room_id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now')
+        FROM (SELECT OLD.room_id AS room_id UNION SELECT NEW.room_id) WHERE true
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER room_versions_matches_delete AFTER DELETE ON matches
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        VALUES (OLD.room_id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now'))
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER room_versions_results_insert AFTER INSERT ON results
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        SELECT room_id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now') FROM matches WHERE rowid == NEW.match_id
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER room_versions_results_update AFTER UPDATE ON results
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        SELECT DISTINCT room_id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now')
+        FROM matches WHERE rowid IN (OLD.match_id, NEW.match_id)
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER room_versions_results_delete AFTER DELETE ON results
+BEGIN
+    INSERT INTO room_versions (room_id, version, updated_at)
+        SELECT room_id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now') FROM matches WHERE rowid == OLD.match_id
+        ON CONFLICT (room_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;
+END;
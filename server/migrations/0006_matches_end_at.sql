@@ -0,0 +1,2 @@
+-- ResultDao.list_with_matches_for_room with a window of the last days or matches of a room.
+CREATE INDEX IF NOT EXISTS matches_room_id_end_at ON matches (room_id, end_at);
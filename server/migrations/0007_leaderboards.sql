@@ -0,0 +1,112 @@
+-- Leaderboard counters per lobby and user, summed over the lobby's rooms and all modes from room_user_stats and
+-- kept current by triggers on it. Lobby 0 holds the global leaderboard over every room.
+
+CREATE TABLE leaderboard_stats (
+    lobby_id        INTEGER NOT NULL,
+    user_id         INTEGER NOT NULL,
+    total_matches   INTEGER NOT NULL,
+    times_imposter  INTEGER NOT NULL,
+    deviation       REAL NOT NULL,
+    wins_crew       INTEGER NOT NULL,
+    wins_imposter   INTEGER NOT NULL,
+    loss_crew       INTEGER NOT NULL,
+    loss_imposter   INTEGER NOT NULL,
+    one_imposter    INTEGER NOT NULL,
+    two_imposters   INTEGER NOT NULL,
+    three_imposters INTEGER NOT NULL,
+
+    PRIMARY KEY (lobby_id, user_id)
+);
+
+INSERT INTO leaderboard_stats
+    SELECT r.lobby_id, s.user_id, SUM(s.total_matches), SUM(s.times_imposter), SUM(s.deviation), SUM(s.wins_crew),
+        SUM(s.wins_imposter), SUM(s.loss_crew), SUM(s.loss_imposter), SUM(s.one_imposter), SUM(s.two_imposters),
+        SUM(s.three_imposters)
+    FROM room_user_stats AS s JOIN rooms AS r ON r.rowid == s.room_id
+    GROUP BY r.lobby_id, s.user_id;
+
+INSERT INTO leaderboard_stats
+    SELECT 0, s.user_id, SUM(s.total_matches), SUM(s.times_imposter), SUM(s.deviation), SUM(s.wins_crew),
+        SUM(s.wins_imposter), SUM(s.loss_crew), SUM(s.loss_imposter), SUM(s.one_imposter), SUM(s.two_imposters),
+        SUM(s.three_imposters)
+    FROM room_user_stats AS s
+    GROUP BY s.user_id;
+
+-- StatsDao.leaderboard, one index per ranking, walked backwards for the top entries.
+CREATE INDEX leaderboard_stats_win_rate
+    ON leaderboard_stats (lobby_id, ((wins_crew + wins_imposter) * 1.0 / total_matches), user_id);
+CREATE INDEX leaderboard_stats_imposter_win_rate
+    ON leaderboard_stats (lobby_id, (wins_imposter * 1.0 / times_imposter), user_id);
+CREATE INDEX leaderboard_stats_deviation
+    ON leaderboard_stats (lobby_id, deviation, user_id);
+
+CREATE TRIGGER leaderboard_stats_insert AFTER INSERT ON room_user_stats
+BEGIN
+    INSERT INTO leaderboard_stats (lobby_id, user_id, total_matches, times_imposter, deviation, wins_crew,
+        wins_imposter, loss_crew, loss_imposter, one_imposter, two_imposters, three_imposters)
+        SELECT scope.lobby_id, NEW.user_id, NEW.total_matches, NEW.times_imposter, NEW.deviation, NEW.wins_crew,
+            NEW.wins_imposter, NEW.loss_crew, NEW.loss_imposter, NEW.one_imposter, NEW.two_imposters,
+            NEW.three_imposters
+        FROM (SELECT lobby_id FROM rooms WHERE rowid == NEW.room_id UNION ALL SELECT 0) AS scope WHERE true
+        ON CONFLICT (lobby_id, user_id) DO UPDATE SET
+            total_matches = total_matches + excluded.total_matches,
+            times_imposter = times_imposter + excluded.times_imposter,
+            deviation = deviation + excluded.deviation,
+            wins_crew = wins_crew + excluded.wins_crew,
+            wins_imposter = wins_imposter + excluded.wins_imposter,
+            loss_crew = loss_crew + excluded.loss_crew,
+            loss_imposter = loss_imposter + excluded.loss_imposter,
+            one_imposter = one_imposter + excluded.one_imposter,
+            two_imposters = two_imposters + excluded.two_imposters,
+            three_imposters = three_imposters + excluded.three_imposters;
+END;
+
+CREATE TRIGGER leaderboard_stats_update AFTER UPDATE ON room_user_stats
+BEGIN
+    INSERT INTO leaderboard_stats (lobby_id, user_id, total_matches, times_imposter, deviation, wins_crew,
+        wins_imposter, loss_crew, loss_imposter, one_imposter, two_imposters, three_imposters)
+        SELECT scope.lobby_id, NEW.user_id,
+            NEW.total_matches - OLD.total_matches,
+            NEW.times_imposter - OLD.times_imposter,
+            NEW.deviation - OLD.deviation,
+            NEW.wins_crew - OLD.wins_crew,
+            NEW.wins_imposter - OLD.wins_imposter,
+            NEW.loss_crew - OLD.loss_crew,
+            NEW.loss_imposter - OLD.loss_imposter,
+            NEW.one_imposter - OLD.one_imposter,
+            NEW.two_imposters - OLD.two_imposters,
+            NEW.three_imposters - OLD.three_imposters
+        FROM (SELECT lobby_id FROM rooms WHERE rowid == NEW.room_id UNION ALL SELECT 0) AS scope WHERE true
+        ON CONFLICT (lobby_id, user_id) DO UPDATE SET
+            total_matches = total_matches + excluded.total_matches,
+            times_imposter = times_imposter + excluded.times_imposter,
+            deviation = deviation + excluded.deviation,
+            wins_crew = wins_crew + excluded.wins_crew,
+            wins_imposter = wins_imposter + excluded.wins_imposter,
+            loss_crew = loss_crew + excluded.loss_crew,
+            loss_imposter = loss_imposter + excluded.loss_imposter,
+            one_imposter = one_imposter + excluded.one_imposter,
+            two_imposters = two_imposters + excluded.two_imposters,
+            three_imposters = three_imposters + excluded.three_imposters;
+END;
+
+CREATE TRIGGER leaderboard_stats_delete AFTER DELETE ON room_user_stats
+BEGIN
+    INSERT INTO leaderboard_stats (lobby_id, user_id, total_matches, times_imposter, deviation, wins_crew,
+        wins_imposter, loss_crew, loss_imposter, one_imposter, two_imposters, three_imposters)
+        SELECT scope.lobby_id, OLD.user_id, -OLD.total_matches, -OLD.times_imposter, -OLD.deviation, -OLD.wins_crew,
+            -OLD.wins_imposter, -OLD.loss_crew, -OLD.loss_imposter, -OLD.one_imposter, -OLD.two_imposters,
+            -OLD.three_imposters
+        FROM (SELECT lobby_id FROM rooms WHERE rowid == OLD.room_id UNION ALL SELECT 0) AS scope WHERE true
+        ON CONFLICT (lobby_id, user_id) DO UPDATE SET
+            total_matches = total_matches + excluded.total_matches,
+            times_imposter = times_imposter + excluded.times_imposter,
+            deviation = deviation + excluded.deviation,
+            wins_crew = wins_crew + excluded.wins_crew,
+            wins_imposter = wins_imposter + excluded.wins_imposter,
+            loss_crew = loss_crew + excluded.loss_crew,
+            loss_imposter = loss_imposter + excluded.loss_imposter,
+            one_imposter = one_imposter + excluded.one_imposter,
+            two_imposters = two_imposters + excluded.two_imposters,
+            three_imposters = three_imposters + excluded.three_imposters;
+END;
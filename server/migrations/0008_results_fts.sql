@@ -0,0 +1,22 @@
+-- Full-text index of results.comments, kept in sync by triggers. The trigram tokenizer matches any substring of at
+-- least three characters regardless of case, like the LIKE '%term%' scans it replaces.
+
+CREATE VIRTUAL TABLE results_fts USING fts5(comments, content='results', content_rowid='rowid', tokenize='trigram');
+
+INSERT INTO results_fts (results_fts) VALUES ('rebuild');
+
+CREATE TRIGGER results_fts_insert AFTER INSERT ON results
+BEGIN
+    INSERT INTO results_fts (rowid, comments) VALUES (NEW.rowid, NEW.comments);
+END;
+
+CREATE TRIGGER results_fts_delete AFTER DELETE ON results
+BEGIN
+    INSERT INTO results_fts (results_fts, rowid, comments) VALUES ('delete', OLD.rowid, OLD.comments);
+END;
+
+CREATE TRIGGER results_fts_update AFTER UPDATE OF comments ON results
+BEGIN
+    INSERT INTO results_fts (results_fts, rowid, comments) VALUES ('delete', OLD.rowid, OLD.comments);
+    INSERT INTO results_fts (rowid, comments) VALUES (NEW.rowid, NEW.comments);
+END;
@@ -2,12 +2,23 @@ function getRoom() {
     return window.location.pathname.split("/").pop()
 }
 
-window.onload = function() {
+var sections = ["games", "matches", "players", "colors", "correlations"];
+
+function refreshSection(section) {
     var xhr = new XMLHttpRequest();
     xhr.onload = function(e) {
-        document.getElementById("games").innerHTML = xhr.response;
+        if (xhr.status === 200) {
+            document.getElementById(section).innerHTML = xhr.response;
+        }
     }
-    xhr.open("GET", "/api/rooms/" + getRoom() + "/games");
+    xhr.open("GET", "/api/rooms/" + getRoom() + "/" + section + window.location.search);
     xhr.setRequestHeader('Accept', 'text/html')
     xhr.send();
-}
\ No newline at end of file
+}
+
+window.onload = function() {
+    // Each section is revalidated against its own ETag, only the ones that changed are sent again.
+    window.setInterval(function() {
+        sections.forEach(refreshSection);
+    }, 30000);
+}
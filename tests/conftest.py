@@ -0,0 +1,91 @@
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from among_us_friends.repository import Repository
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / 'server' / 'schema.sql'
+
+COLORS = ('red', 'blue', 'green', 'pink', 'orange', 'yellow', 'black', 'white', 'purple', 'brown', 'cyan', 'lime')
+
+
+def stat_counts(stat):
+    """The counters of an ImposterStat or StatsTableRow, comparable between the stats engines."""
+    return (stat.title, stat.total_matches, stat.times_imposter, round(stat.deviation, 9), stat.wins_crew,
+            stat.wins_imposter, stat.loss_crew, stat.loss_imposter, tuple(stat.imposter_counts[n] for n in (1, 2, 3)))
+
+
+def add_matches(repo: Repository, room, users, count: int, rng: random.Random, start: datetime):
+    """Add ``count`` random matches with a result for each of their players, in one transaction."""
+    matches = []
+    for index in range(count):
+        players = rng.randint(4, 10)
+        matches.append(SimpleNamespace(
+            room=room, owner=rng.choice(users), host=rng.choice(users), title=f'{start:%Y%m%d}-{index}',
+            end_at=(start + timedelta(minutes=15 * index)).isoformat(), players=players,
+            mode=rng.choice(('normal', 'normal', 'hide')), map=rng.choice(('skeld', 'mira', 'polus')),
+            result='normal', network=rng.choice(('online', 'local'))))
+    match_rowids = repo.match_dao().create_many(matches)
+    results = []
+    for match, rowid in zip(matches, match_rowids):
+        imposters = rng.randint(1, min(3, match.players - 3))
+        imposters_won = rng.random() < 0.4
+        for seat, (user, color) in enumerate(zip(rng.sample(users, match.players), rng.sample(COLORS, match.players))):
+            imposter = seat < imposters
+            results.append(SimpleNamespace(
+                match_rowid=rowid, user=user, timestamp=match.end_at, platform=rng.choice(('windows pc', 'android')),
+                color=color, imposter=imposter, victory=imposter == imposters_won, death=rng.random() < 0.5,
+                comments=rng.choice(('', 'panda', 'gg'))))
+    repo.result_dao().create_many(results)
+    repo.commit()
+    return match_rowids
+
+
+@pytest.fixture
+def room_db(tmp_path):
+    """A database holding one room with 80 random matches between 12 players. Returns a factory of repositories
+    and the room."""
+    db_path = tmp_path / 'db.sqlite'
+    rng = random.Random(7)
+
+    def open_repository(readonly=False):
+        return Repository(db_path, SCHEMA_PATH, readonly=readonly)
+
+    with open_repository() as repo:
+        users = [repo.user_dao().create(f'player{n}', None) for n in range(12)]
+        lobby = repo.lobby_dao().create('Friends', True)
+        room = repo.room_dao().create(lobby, 'main')
+        repo.commit()
+        add_matches(repo, room, users, 80, rng, datetime(2020, 9, 25, 21))
+    return SimpleNamespace(open_repository=open_repository, db_path=db_path, room=room, users=users, rng=rng)
+
+
+@pytest.fixture(scope='session')
+def flask_app(tmp_path_factory):
+    """The app, imported from a scratch directory so the config it generates is written there."""
+    directory = tmp_path_factory.mktemp('app')
+    (directory / 'server').mkdir()
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        from app import app
+    finally:
+        os.chdir(cwd)
+    app.root_path = str(Path(__file__).resolve().parent.parent)
+    return app
+
+
+@pytest.fixture
+def client(flask_app, room_db, monkeypatch):
+    """A test client of the app on the database of ``room_db``, logged in as its first user."""
+    monkeypatch.setitem(flask_app.config, 'DB_PATH', str(room_db.db_path))
+    monkeypatch.setitem(flask_app.config, 'SCHEMA_PATH', str(SCHEMA_PATH))
+    c = flask_app.test_client()
+    with c.session_transaction() as session:
+        session['_user_id'] = room_db.users[0].uuid.hex
+        session['_fresh'] = True
+    return c
@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.mark.parametrize('headers, mimetype', [
+    ({}, 'text/html'),
+    ({'Accept': 'text/html'}, 'text/html'),
+    ({'Accept': 'application/json'}, 'application/json'),
+    ({'Accept': '*/*'}, 'text/html'),
+])
+def test_fragment_negotiates_mimetype(client, room_db, headers, mimetype):
+    response = client.get(f'/api/rooms/{room_db.room.uuid.hex}/players', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+
+
+def test_fragment_rejects_unacceptable_mimetype(client, room_db):
+    response = client.get(f'/api/rooms/{room_db.room.uuid.hex}/players', headers={'Accept': 'image/png'})
+    assert response.status_code == 400
+
+
+def test_fragment_is_conditional(client, room_db):
+    path = f'/api/rooms/{room_db.room.uuid.hex}/colors'
+    etag = client.get(path).headers['ETag']
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+
+@pytest.mark.parametrize('limit, rows', [(-1, 1), (0, 1), (2, 2), (1000, None)])
+def test_correlations_limit_is_clamped(client, room_db, limit, rows):
+    path = f'/api/rooms/{room_db.room.uuid.hex}/correlations?limit={limit}'
+    tables = client.get(path, headers={'Accept': 'application/json'}).get_json()
+    everything = client.get(path.replace(f'limit={limit}', 'limit=100'),
+                            headers={'Accept': 'application/json'}).get_json()
+    for name, table in tables.items():
+        assert table == everything[name][:rows]
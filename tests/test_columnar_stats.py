@@ -0,0 +1,32 @@
+import pytest
+
+from among_us_friends import columnar_stats
+from among_us_friends.columnar_stats import ColumnarMatchesStats
+from among_us_friends.stats import GroupedMatchesStats
+from tests.conftest import stat_counts
+
+
+def _tables(stats):
+    return {name: sorted(stat_counts(row) for row in table.values()) for name, table in stats.items()}
+
+
+@pytest.mark.parametrize('mode, since, last', [('%', '', -1), ('normal', '', -1), ('%', '2020-09-26', -1),
+                                               ('%', '', 20)])
+def test_columnar_matches_grouped(room_db, mode, since, last):
+    pytest.importorskip('numpy')
+    with room_db.open_repository(readonly=True) as repo:
+        grouped = GroupedMatchesStats(room_db.room, mode, since=since, last=last).using(repo)
+        columnar = ColumnarMatchesStats(room_db.room, mode, since=since, last=last).using(repo)
+    assert set(grouped) == {'player', 'color', 'map', 'network', 'platform', 'host', 'mode'}
+    assert _tables(columnar) == _tables(grouped)
+    # Groups are numbered in the same order, so ties keep their order on the page.
+    assert {name: table.titles for name, table in columnar.items()} == \
+           {name: table.titles for name, table in grouped.items()}
+
+
+def test_columnar_without_numpy_falls_back_to_grouped(room_db, monkeypatch):
+    monkeypatch.setattr(columnar_stats, 'numpy', None)
+    with room_db.open_repository(readonly=True) as repo:
+        expected = _tables(GroupedMatchesStats(room_db.room).using(repo))
+        actual = _tables(ColumnarMatchesStats(room_db.room).using(repo))
+    assert actual == expected
@@ -0,0 +1,37 @@
+from threading import Event
+
+import pytest
+from flask import g
+
+from among_us_friends.dependencies import DependencyCall
+from among_us_friends.instrumentation import DependencyTimings
+
+
+def _fail():
+    raise ConnectionRefusedError(111, 'Connection refused')
+
+
+@pytest.fixture
+def timings(flask_app):
+    with flask_app.app_context():
+        g.dependency_timings = DependencyTimings()
+        yield g.dependency_timings
+
+
+def test_result(timings):
+    assert DependencyCall('games', lambda a, b: a + b, 1, 2).result(1.0) == 3
+    assert [status for _, _, status in timings.records] == ['ok']
+
+
+def test_result_after_timeout_is_default(timings):
+    release = Event()
+    try:
+        assert DependencyCall('games', release.wait).result(0.01, default=[]) == []
+    finally:
+        release.set()
+    assert [status for _, _, status in timings.records] == ['timeout']
+
+
+def test_result_after_error_is_default(timings):
+    assert DependencyCall('games', _fail).result(1.0) is None
+    assert [status for _, _, status in timings.records] == ['error']
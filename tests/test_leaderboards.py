@@ -0,0 +1,59 @@
+import pytest
+
+from among_us_friends.instrumentation import QueryLog
+from among_us_friends.repository import Repository, StatsDao
+from tests.conftest import SCHEMA_PATH
+
+
+def _pages(repo, ranking, limit):
+    after = None
+    while True:
+        page = list(repo.stats_dao().leaderboard(None, ranking, 1, limit, after))
+        yield from page
+        if len(page) < limit:
+            return
+        after = (page[-1].value, page[-1].uuid)
+
+
+@pytest.mark.parametrize('ranking', StatsDao.rankings)
+def test_pages_continue_the_leaderboard(room_db, ranking):
+    with room_db.open_repository(readonly=True) as repo:
+        entries = [entry.uuid for entry in repo.stats_dao().leaderboard(None, ranking, 1, 100)]
+        assert len(entries) == len(room_db.users)
+        assert [entry.uuid for entry in _pages(repo, ranking, 5)] == entries
+
+
+@pytest.mark.parametrize('ranking', StatsDao.rankings)
+def test_page_after_seeks_the_ranking_index(room_db, ranking):
+    query_log = QueryLog()
+    with Repository(room_db.db_path, SCHEMA_PATH, readonly=True, query_log=query_log) as repo:
+        first = next(iter(repo.stats_dao().leaderboard(None, ranking, 1, 1)))
+        list(repo.stats_dao().leaderboard(None, ranking, 1, 5, (first.value, first.uuid)))
+        record = query_log.records[-1]
+        plan = ' '.join(row[-1] for row in repo._conn.execute('EXPLAIN QUERY PLAN ' + record.sql,
+                                                               record._parameters))
+    assert f'USING INDEX leaderboard_stats_{ranking} (lobby_id=? AND ' in plan
+    assert '<?)' in plan
+
+
+@pytest.mark.parametrize('query', [
+    'after_user=00000000000000000000000000000000',
+    'after=0.5',
+    'after=high&after_user=00000000000000000000000000000000',
+    'after=0.5&after_user=player0',
+])
+def test_malformed_page_is_bad_request(client, query):
+    assert client.get(f'/leaderboard?{query}').status_code == 400
+
+
+def test_next_page_link(client, room_db):
+    response = client.get('/leaderboard?min_games=1&limit=5')
+    assert response.status_code == 200
+    assert b'after_user=' in response.data
+
+
+@pytest.mark.parametrize('limit, entries', [(0, 1), (-1, 1), (5, 5), (1000, 12)])
+def test_limit_is_clamped(client, limit, entries):
+    response = client.get(f'/leaderboard?min_games=1&limit={limit}')
+    assert response.status_code == 200
+    assert response.data.count(b'<tr>') - 1 == entries
@@ -0,0 +1,84 @@
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from among_us_friends.migrations import Migrator
+
+SERVER = Path(__file__).resolve().parent.parent / 'server'
+SCHEMA_PATH = SERVER / 'schema.sql'
+MIGRATIONS_PATH = SERVER / 'migrations'
+
+# The lookups 0002_indexes.sql adds an index for, their plan without it and the index they should use after it.
+INDEXED_LOOKUPS = [
+    ('SELECT * FROM games WHERE room_id == 1', 'SCAN games', 'games_room_id'),
+    ('SELECT * FROM rooms WHERE lobby_id == 1', 'SCAN rooms', 'rooms_lobby_id'),
+    ("SELECT * FROM matches WHERE room_id == 1 AND mode LIKE '%'", 'SCAN matches', 'matches_room_id_mode'),
+    ("SELECT * FROM matches WHERE uuid == x'00'", 'SCAN matches', 'matches_uuid'),
+    ('SELECT user_id FROM results WHERE match_id == 1 AND imposter == 1',
+     'SEARCH results USING INDEX sqlite_autoindex_results_1', 'COVERING INDEX results_match_id_imposter'),
+]
+
+
+def _plan(conn, sql):
+    return ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+
+
+def _migrated(tmp_path, *scripts):
+    migrations_path = tmp_path / 'migrations'
+    migrations_path.mkdir(exist_ok=True)
+    for script in scripts:
+        shutil.copy(MIGRATIONS_PATH / script, migrations_path)
+    conn = sqlite3.connect(tmp_path / 'db.sqlite')
+    Migrator(SCHEMA_PATH, migrations_path).migrate(conn)
+    return conn
+
+
+@pytest.mark.parametrize('sql, before, index', INDEXED_LOOKUPS)
+def test_indexes_change_query_plans(tmp_path, sql, before, index):
+    conn = _migrated(tmp_path)
+    assert before in _plan(conn, sql)
+    conn.close()
+
+    conn = _migrated(tmp_path, '0002_indexes.sql')
+    after = _plan(conn, sql)
+    assert after.startswith('SEARCH') and index in after
+    conn.close()
+
+
+def test_migrate_is_idempotent(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'db.sqlite')
+    migrator = Migrator(SCHEMA_PATH, MIGRATIONS_PATH)
+    migrator.migrate(conn)
+    migrator.migrate(conn)
+    newest = migrator.migrations()[-1].version
+    assert Migrator.version(conn) == newest
+    assert conn.execute('SELECT COUNT(*) FROM schema_migrations').fetchone()[0] == len(migrator.migrations())
+
+
+def test_concurrent_migrations_apply_each_script_once(tmp_path):
+    db_path = tmp_path / 'db.sqlite'
+    errors = []
+    start = threading.Barrier(4)
+
+    def migrate():
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            start.wait()
+            Migrator(SCHEMA_PATH, MIGRATIONS_PATH).migrate(conn)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=migrate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    conn = sqlite3.connect(db_path)
+    versions = [row[0] for row in conn.execute('SELECT version FROM schema_migrations ORDER BY version')]
+    assert versions == [m.version for m in Migrator(SCHEMA_PATH, MIGRATIONS_PATH).migrations()]
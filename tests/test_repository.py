@@ -0,0 +1,19 @@
+import pytest
+
+
+def test_identities_are_shared_and_read_only(room_db):
+    user = room_db.users[0]
+    with room_db.open_repository(readonly=True) as repo:
+        first = repo.user_dao().require_uuid(user.uuid)
+    with room_db.open_repository(readonly=True) as repo:
+        second = repo.user_dao().require_uuid(user.uuid)
+        assert repo.identity('users', first.rowid) is second
+        room = repo.room_dao().require_room(room_db.room.uuid)
+        lobby = repo.lobby_dao().get_by_rowid(room.lobby)
+    assert first is second
+    assert not first.secure
+    with pytest.raises(AttributeError):
+        first.username = 'someone else'
+    for row in (room, lobby):
+        with pytest.raises(AttributeError):
+            row.title = 'changed'
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from among_us_friends.room_correlations import RoomCorrelations, HtmlRoomCorrelationsFormatter
+
+
+def test_engines_are_bounded():
+    for _ in range(RoomCorrelations._engines.capacity + 10):
+        RoomCorrelations.engine(SimpleNamespace(uuid=uuid4()))
+    assert len(RoomCorrelations._engines) == RoomCorrelations._engines.capacity
+
+
+def test_engines_are_kept_per_mode_name_only():
+    room = SimpleNamespace(uuid=uuid4())
+    assert RoomCorrelations.engine(room, 'Normal') is RoomCorrelations.engine(room, 'normal')
+    assert RoomCorrelations.engine(room, '%') is RoomCorrelations.engine(room, '%')
+    assert RoomCorrelations.engine(room, 'n%') is not RoomCorrelations.engine(room, 'n%')
+    assert RoomCorrelations.engine(room, 'h_de') is not RoomCorrelations.engine(room, 'h_de')
+
+
+def test_wildcard_mode_matches_cached_engine(room_db):
+    with room_db.open_repository(readonly=True) as repo:
+        cached = RoomCorrelations(room_db.room, 'normal').using(repo)
+        pattern = RoomCorrelations(room_db.room, 'n%').using(repo)
+    assert cached.chosen_probability
+    assert pattern.imposter_pairs == cached.imposter_pairs
+    assert pattern.chosen_probability == cached.chosen_probability
+
+
+def test_formatter_limits_every_table(room_db):
+    with room_db.open_repository(readonly=True) as repo:
+        corr = RoomCorrelations(room_db.room).using(repo)
+    html = HtmlRoomCorrelationsFormatter(corr, limit=2).format()
+    assert len(corr.chosen_probability) > 2
+    assert html.count('<tr><td>') == 4 * 2
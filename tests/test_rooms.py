@@ -0,0 +1,101 @@
+import logging
+import re
+from time import perf_counter, sleep
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from among_us_friends import games_controller
+from among_us_friends.repository import ConnectionPool
+from among_us_friends.room_view import RoomView
+from tests.conftest import SCHEMA_PATH
+
+
+@pytest.fixture
+def held_connections(room_db, monkeypatch):
+    """The number of connections acquired from the pool of ``room_db`` and not yet released."""
+    pool = ConnectionPool.shared(room_db.db_path, SCHEMA_PATH)
+    acquire, release = pool.acquire, pool.release
+    held = [0]
+
+    def counted_acquire(readonly):
+        held[0] += 1
+        return acquire(readonly)
+
+    def counted_release(conn, readonly):
+        held[0] -= 1
+        return release(conn, readonly)
+    monkeypatch.setattr(pool, 'acquire', counted_acquire)
+    monkeypatch.setattr(pool, 'release', counted_release)
+    return held
+
+
+def test_room_page(client, room_db):
+    response = client.get(f'/rooms/{room_db.room.uuid.hex}')
+    assert response.status_code == 200
+    assert b'player0' in response.data
+    assert client.get(f'/rooms/{room_db.room.uuid.hex}',
+                      headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+@pytest.mark.parametrize('read', [True, False])
+def test_room_page_releases_its_repository(client, room_db, held_connections, read):
+    response = client.get(f'/rooms/{room_db.room.uuid.hex}')
+    assert held_connections[0] == 1
+    if read:
+        response.get_data()
+    response.close()
+    assert held_connections[0] == 0
+
+
+def test_missing_room_releases_its_repository(client, held_connections):
+    assert client.get(f'/rooms/{"0" * 32}').status_code == 404
+    assert held_connections[0] == 0
+
+
+def test_room_page_logs_its_queries_when_streamed(client, room_db, caplog):
+    caplog.set_level(logging.INFO)
+    response = client.get(f'/rooms/{room_db.room.uuid.hex}')
+    assert 'db;' not in ''.join(response.headers.getlist('Server-Timing'))
+    response.get_data()
+    response.close()
+    logged = [r.getMessage() for r in caplog.records if ' streamed: ' in r.getMessage()]
+    assert len(logged) == 1 and logged[0].startswith(f'GET /rooms/{room_db.room.uuid.hex}?')
+    queries = int(re.search(r'desc="(\d+) queries"', logged[0]).group(1))
+    assert queries > 5
+
+
+def test_buffered_page_reports_server_timing(client):
+    response = client.get('/leaderboard?min_games=1')
+    assert re.match(r'db;dur=[\d.]+;desc="\d+ queries"', response.headers['Server-Timing'])
+
+
+def test_games_overlap_database_sections(client, room_db, monkeypatch):
+    started = perf_counter()
+    events = {}
+
+    def slow_games(room_uuid):
+        sleep(0.3)
+        events['games answered'] = perf_counter() - started
+        return [SimpleNamespace(uuid=uuid4(), title='Friday')]
+
+    def player_stats(self, repo):
+        events.setdefault('player stats started', perf_counter() - started)
+        return player_stats_of(self, repo)
+    player_stats_of = RoomView._player_stats
+    monkeypatch.setattr(games_controller, 'get_games_for_room', slow_games)
+    monkeypatch.setattr(RoomView, '_player_stats', player_stats)
+    response = client.get(f'/rooms/{room_db.room.uuid.hex}?mode=normal')
+    assert events == {}
+    html = response.get_data(as_text=True)
+    assert events['player stats started'] < events['games answered']
+    assert 'Friday' in html
+
+
+def test_room_page_etag_ignores_games(client, room_db, monkeypatch):
+    path = f'/rooms/{room_db.room.uuid.hex}'
+    etag = client.get(path).headers['ETag']
+    monkeypatch.setattr(games_controller, 'get_games_for_room',
+                        lambda room_uuid: [SimpleNamespace(uuid=uuid4(), title='Friday')])
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
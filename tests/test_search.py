@@ -0,0 +1,43 @@
+import pytest
+
+from among_us_friends.repository import SearchTermException, fts_query
+
+
+def test_fts_query_quotes_words():
+    assert fts_query('panda win') == '"panda" "win"'
+    assert fts_query('say "hi" now') == '"say" """hi""" "now"'
+
+
+@pytest.mark.parametrize('text', ['', '  ', 'pa', 'panda gg'])
+def test_fts_query_rejects_short_words(text):
+    with pytest.raises(SearchTermException):
+        fts_query(text)
+
+
+def test_keywords(client, room_db):
+    response = client.get(f'/api/rooms/{room_db.room.uuid.hex}/keywords?term=panda')
+    assert response.status_code == 200
+    assert sum(entry['count'] for entry in response.get_json()['panda']) > 0
+
+
+@pytest.mark.parametrize('query', ['term=pa', 'term=panda&term=gg', 'term='])
+def test_keywords_reject_short_terms(client, room_db, query):
+    assert client.get(f'/api/rooms/{room_db.room.uuid.hex}/keywords?{query}').status_code == 400
+
+
+def test_search_comments(client):
+    response = client.get('/api/comments/search?q=pand')
+    assert response.status_code == 200
+    assert response.get_json() and all('panda' in hit['comments'] for hit in response.get_json())
+
+
+@pytest.mark.parametrize('query', ['q=gg', 'q=panda+gg'])
+def test_search_comments_rejects_short_words(client, query):
+    assert client.get(f'/api/comments/search?{query}').status_code == 400
+
+
+@pytest.mark.parametrize('limit, hits', [(-1, 1), (0, 1), (3, 3)])
+def test_search_comments_limit_is_clamped(client, limit, hits):
+    response = client.get(f'/api/comments/search?q=pand&limit={limit}')
+    assert response.status_code == 200
+    assert len(response.get_json()) == hits
@@ -0,0 +1,66 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from among_us_friends.repository import BatchInsertException
+from among_us_friends.stats import PlayersMatchesStats, ColorsMatchesStats, PlayersRoomStats, ColorsRoomStats
+from tests.conftest import stat_counts
+
+ENGINES = [
+    (PlayersMatchesStats, PlayersRoomStats),
+    (ColorsMatchesStats, ColorsRoomStats),
+]
+
+
+@pytest.mark.parametrize('python_stats, room_stats', ENGINES)
+@pytest.mark.parametrize('mode', ['%', 'normal', 'hide'])
+def test_sql_aggregation_matches_python(room_db, python_stats, room_stats, mode):
+    with room_db.open_repository(readonly=True) as repo:
+        matches = list(repo.match_dao().list_for_room(room_db.room, mode))
+        expected = sorted(stat_counts(s) for s in python_stats(matches).using(repo))
+        actual = sorted(stat_counts(s) for s in room_stats(room_db.room, mode, live=True).using(repo))
+    assert expected
+    assert actual == expected
+
+
+def _maintained_and_live(repo, room):
+    return [(sorted(stat_counts(s) for s in stats(room).using(repo)),
+             sorted(stat_counts(s) for s in stats(room, live=True).using(repo)))
+            for stats in (PlayersRoomStats, ColorsRoomStats)]
+
+
+def _duplicate_color(repo, room_db):
+    """A result which repeats the color of another player in one of the room's matches."""
+    match_rowid, color, seated = repo._conn.execute(
+        'SELECT match_id, MIN(color), GROUP_CONCAT(user_id) FROM results GROUP BY match_id LIMIT 1').fetchone()
+    seated = {int(rowid) for rowid in seated.split(',')}
+    user = next(u for u in room_db.users if repo.user_dao().require_uuid(u.uuid).rowid not in seated)
+    return SimpleNamespace(match_rowid=match_rowid, user=user, timestamp='2020-09-26T00:00:00', platform='android',
+                           color=color, imposter=False, victory=True, death=False, comments='')
+
+
+def _leaderboard_totals(repo):
+    return repo._conn.execute('SELECT SUM(total_matches), SUM(wins_crew) FROM leaderboard_stats').fetchone()
+
+
+def test_maintained_stats_match_live(room_db):
+    with room_db.open_repository(readonly=True) as repo:
+        for maintained, live in _maintained_and_live(repo, room_db.room):
+            assert maintained == live
+
+
+@pytest.mark.parametrize('create', [
+    lambda dao, result: dao.create(result),
+    lambda dao, result: dao.create_many([result]),
+])
+def test_failed_create_leaves_maintained_stats_intact(room_db, create):
+    with room_db.open_repository() as repo:
+        totals = _leaderboard_totals(repo)
+        with pytest.raises((sqlite3.IntegrityError, BatchInsertException)):
+            create(repo.result_dao(), _duplicate_color(repo, room_db))
+        repo.commit()
+    with room_db.open_repository(readonly=True) as repo:
+        for maintained, live in _maintained_and_live(repo, room_db.room):
+            assert maintained == live
+        assert _leaderboard_totals(repo) == totals